@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+# Every cache object with a ``stats()`` method, reported by ``cache_stats``
+_registry: dict[str, Any] = {}
+
+# Result of an in-flight load whose caller was cancelled: waiters load again
+_RELOAD = object()
+
+
+def register_cache(name: str, cache: Any) -> None:
+    _registry[name] = cache
+
+
+class TTLCache:
+    """Per-worker in-memory cache with expiry and single-flight loading.
+
+    Concurrent ``get_or_load`` calls for the same missing key share one loader
+    call. Loader exceptions are propagated to every waiter and never cached; if
+    the caller running the loader is cancelled (client went away), the waiters
+    are not failed but retry, and one of them loads again.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        register_cache(name, self)
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return False, None
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            return value
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if key not in self._data and len(self._data) >= self.maxsize:
+            # Drop the oldest entry (dicts keep insertion order)
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Forget ``key``; a load already in flight will not store its result."""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._inflight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+
+            future = self._inflight.get(key)
+            if future is None:
+                self.misses += 1
+                return await self._load(key, loader)
+            self.coalesced += 1
+            value = await asyncio.shield(future)
+            if value is not _RELOAD:
+                return value
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.set_result(_RELOAD)
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved: nobody may be waiting
+            raise
+        else:
+            if self._inflight.get(key) is future:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+        }
+
+
+def cache_stats() -> dict[str, dict]:
+    """Counters of every cache created in this worker, keyed by cache name."""
+    return {name: cache.stats() for name, cache in _registry.items()}
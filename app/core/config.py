@@ -1,6 +1,12 @@
+from functools import cached_property
+
 from pydantic_settings import BaseSettings
 
 
+def _parse_logins(value: str) -> frozenset[str]:
+    return frozenset(login.strip() for login in value.split(",") if login.strip())
+
+
 class Settings(BaseSettings):
     """Application configuration loaded from environment variables (.env)."""
 
@@ -15,17 +21,87 @@ class Settings(BaseSettings):
     TRACKER_TOKEN: str | None = None
     TRACKER_ORG_ID: str | None = None
     TRACKER_QUEUE: str | None = None
+    TRACKER_API_URL: str = "https://api.tracker.yandex.net"
+    TRACKER_TIMEOUT: float = 30.0  # seconds, per read/write
+    TRACKER_CONNECT_TIMEOUT: float = 5.0
+    TRACKER_RETRIES: int = 2  # extra attempts for transient failures
+    TRACKER_RETRY_BACKOFF: float = 0.5  # seconds, doubled on each retry
+    TRACKER_MAX_CONNECTIONS: int = 20  # keep-alive pool size per worker
+    TRACKER_HTTP2: bool = True  # used only if the `h2` package is installed
+    TRACKER_BATCH_CONCURRENCY: int = 8  # parallel issue creations in batch operations
+    TRACKER_RATE_LIMIT: float = 10.0  # requests per second per worker, 0 disables throttling
+    TRACKER_RATE_BURST: int = 20  # requests allowed at once after an idle period
+    TRACKER_RETRY_AFTER_MAX: float = 60.0  # seconds, upper bound for a honoured Retry-After
+    ISSUE_STATUS_CACHE_TTL: float = 30.0  # seconds a fetched issue status is reused by the dashboard
+    TRACKER_WEBHOOK_SECRET: str | None = None  # shared token expected by /tracker/webhook/*
+    TASK_RECONCILE_INTERVAL: int = 300  # seconds between bulk status refreshes of open tasks
+    TASK_RECONCILE_PAGE_SIZE: int = 100  # issue keys per _search request
+    EMPLOYEE_TASKS_CACHE_TTL: float = 60.0  # seconds an employee's task list is reused
+    EMPLOYEE_TASKS_PAGE_SIZE: int = 50  # tasks per page of /employee/tasks
+    EMPLOYEE_TASKS_SCROLL_SIZE: int = 500  # issues per scroll request (Tracker allows up to 1000)
+    EMPLOYEE_TASKS_MAX: int = 5000  # stop scrolling after this many issues
 
     # Database
     DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/postgres"
+    DATABASE_ASYNC_URL: str | None = None  # defaults to DATABASE_URL with the asyncpg (aiosqlite) driver
+    # Pool sizes are per engine and per uvicorn worker; each worker has a sync and an async engine
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5  # extra connections opened under load and closed when returned
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds after which a connection is replaced
+    DB_SLOW_QUERY_THRESHOLD: float = 0.5  # seconds; slower statements are logged with parameters and plan, 0 disables
+    DB_N_PLUS_ONE_THRESHOLD: int = 5  # identical statements in one request logged as a probable N+1
 
     # Files
     UPLOAD_DIR: str = "uploaded_files"
+    ARCHIVE_REPORT_FILES: bool = True  # keep a local copy of each report file in UPLOAD_DIR
+    UPLOAD_BLOB_GRACE: int = 3600  # seconds an unreferenced stored body is kept before the bootstrap purges it
+    ATTACHMENT_ZIP_CONCURRENCY: int = 4  # attachments downloaded ahead of the ZIP writer
+    ATTACHMENT_ZIP_BUFFER_CHUNKS: int = 16  # 64 KiB chunks buffered per attachment download
+    ATTACHMENT_CACHE_DIR: str = "cache/attachments"
+    ATTACHMENT_CACHE_MAX_BYTES: int = 2 * 1024 ** 3  # LRU-evicted above this size
+    ATTACHMENT_LIST_CACHE_TTL: float = 300.0  # seconds an issue's attachment listing is reused
+
+    # Background jobs (per uvicorn worker)
+    JOB_WORKERS: int = 2  # jobs executed concurrently
+    JOB_POLL_INTERVAL: float = 5.0  # seconds between checks for queued jobs
+    JOB_FLUSH_INTERVAL: float = 1.0  # seconds between progress/heartbeat writes
+    JOB_STALE_AFTER: int = 60  # seconds without heartbeat before a running job is resumed elsewhere
+
+    # Report submission outbox (per uvicorn worker)
+    OUTBOX_CONCURRENCY: int = 4  # reports synced to Tracker concurrently
+    OUTBOX_POLL_INTERVAL: float = 5.0  # seconds between checks for due steps
+    OUTBOX_LEASE: int = 300  # seconds a claimed report is reserved for one worker
+    OUTBOX_MAX_ATTEMPTS: int = 8  # attempts before a step is marked failed
+    OUTBOX_RETRY_BASE: float = 5.0  # seconds, doubled after each failed attempt
+    OUTBOX_RETRY_MAX: float = 600.0
+
+    # Exports
+    EXPORT_BATCH_SIZE: int = 2000  # rows fetched per server-side cursor round-trip
+    EXPORT_CACHE_DIR: str = "cache/exports"
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 ** 2  # LRU-evicted above this size
+    EXPORT_CACHE_MAX_AGE: int = 7 * 24 * 3600  # seconds an unused export is kept
+
+    # Profiling (admins add ?profile=1 or X-Profile: 1 to a request)
+    PROFILE_DIR: str = "cache/profiles"
+    PROFILE_KEEP: int = 50  # newest profiles kept in PROFILE_DIR
+    PROFILE_SAMPLE_INTERVAL: float = 0.005  # seconds between stack samples
 
     # Application
+    DEBUG: bool = False  # adds X-DB-Query-Count / X-DB-Time-Ms headers to every response
+    ADMIN_PAGE_SIZE: int = 100  # reports per page of the admin list
     ADMIN_LOGINS: str = "yakovleva.sv"  # comma-separated list of admin logins
     REVIEWER_LOGINS: str = "yakovleva.sv"  # comma-separated list of reviewer logins
     SECRET_KEY: str = "change-me"  # used to sign session cookies
+    USER_CACHE_TTL: float = 300.0  # seconds a resolved session user is reused without a DB query
+
+    @cached_property
+    def admin_logins(self) -> frozenset[str]:
+        return _parse_logins(self.ADMIN_LOGINS)
+
+    @cached_property
+    def reviewer_logins(self) -> frozenset[str]:
+        return _parse_logins(self.REVIEWER_LOGINS)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,34 @@
+"""Conditional GET helpers shared by the page and file routers."""
+import hashlib
+
+from fastapi import Response
+
+# Personal pages: the browser keeps a copy but must revalidate it on every use
+PAGE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``etag`` with an ``If-None-Match`` header (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def weak_etag(*parts: object) -> str:
+    """Weak ETag for a page rendered from ``parts`` (watermarks, user, template version)."""
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def page_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL}
+
+
+def not_modified(etag: str, if_none_match: str | None) -> Response | None:
+    """A 304 response when the client already has the page ``etag``, otherwise ``None``."""
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=page_headers(etag))
+    return None
@@ -0,0 +1,157 @@
+"""Prometheus metrics shared by all modules.
+
+With several uvicorn workers set ``PROMETHEUS_MULTIPROC_DIR`` to a directory
+that is emptied before the workers start (``python -m app.db.bootstrap`` does
+that); every worker then writes its samples there and ``/metrics`` served by any
+worker aggregates all of them.
+"""
+import os
+import re
+import shutil
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # prometheus_client needs the directory before the first metric is created
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, by route template.",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+tracker_requests = Counter(
+    "tracker_requests_total",
+    "Tracker API calls by operation and result (HTTP status or exception name).",
+    ["op", "method", "status"],
+)
+tracker_request_duration = Histogram(
+    "tracker_request_duration_seconds",
+    "Tracker API call latency up to the response headers, per attempt.",
+    ["op", "method"],
+    buckets=_LATENCY_BUCKETS,
+)
+tracker_queue_wait = Histogram(
+    "tracker_queue_wait_seconds",
+    "Time a Tracker call waited for the rate limiter, by priority lane.",
+    ["lane"],
+    buckets=_LATENCY_BUCKETS,
+)
+tracker_throttled = Counter(
+    "tracker_throttled_total",
+    "Tracker responses that asked to back off (429/503 with Retry-After).",
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time.",
+    ["engine"],
+    buckets=_DB_BUCKETS,
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["engine"],
+    buckets=_DB_BUCKETS,
+)
+upload_bytes = Counter(
+    "upload_bytes_total",
+    "Bytes of uploaded report files: received from users and sent to Tracker.",
+    ["direction"],
+)
+
+# Tracker API paths -> operation label; the first match wins
+_TRACKER_OPERATIONS = [
+    (re.compile(r"/v\d+/issues/_search"), "search"),
+    (re.compile(r"/v\d+/issues/[^/]+/comments"), "comment"),
+    (re.compile(r"/v\d+/issues/[^/]+/attachments"), "attachment"),
+    (re.compile(r"/v\d+/issues/[^/]+/transitions"), "transition"),
+    (re.compile(r"/v\d+/issues/?[^/]*$"), "issue"),
+    (re.compile(r"/v\d+/queues"), "queue"),
+    (re.compile(r"/v\d+/myself"), "myself"),
+    (re.compile(r"/v\d+/users"), "user"),
+]
+
+
+def tracker_operation(path: str) -> str:
+    for pattern, op in _TRACKER_OPERATIONS:
+        if pattern.search(path):
+            return op
+    return "other"
+
+
+def observe_tracker_call(op: str, method: str, status: int | str, seconds: float) -> None:
+    tracker_requests.labels(op, method, str(status)).inc()
+    tracker_request_duration.labels(op, method).observe(seconds)
+
+
+def clear_multiprocess_dir() -> None:
+    """Remove samples of previous runs; call before the workers start."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def mark_worker_dead() -> None:
+    """Drop the live gauges of this worker; call on worker shutdown."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def metrics_response(request: Request) -> Response:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
+    return Response(data, media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Records ``http_request_duration_seconds`` labelled with the matched route template.
+
+    Unmatched paths share one label value so scanners cannot blow up cardinality.
+    """
+
+    def __init__(self, app: ASGIApp, exclude: tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"], getattr(route, "path", None) or "unmatched", str(status)
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,234 @@
+"""Opt-in profiling of single requests for admins.
+
+A request carrying ``?profile=1`` or ``X-Profile: 1`` from an admin session is
+sampled every ``PROFILE_SAMPLE_INTERVAL`` seconds (the stacks of all threads,
+so ``def`` endpoints running in the threadpool are covered too) while DB
+statements, Tracker calls and template rendering report their time through
+``record_timing``. The profile is saved under ``PROFILE_DIR`` (the newest
+``PROFILE_KEEP`` are kept) and its id returned in ``X-Profile-Id``.
+
+Stacks are written in the folded format (``frame;frame;frame count``) read by
+flamegraph.pl, speedscope and inferno. Samples include whatever else the
+worker was doing at the time, so profile on a quiet worker when possible.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+CATEGORIES = ("db", "tracker", "template")
+# Leaf frames of threads that are just waiting; left out of ``top_frames``
+_IDLE_FRAMES = frozenset({
+    "threading.Condition.wait",
+    "threading.Event.wait",
+    "queue.Queue.get",
+    "selectors.EpollSelector.select",
+    "selectors.KqueueSelector.select",
+    "aiosqlite.core._connection_worker_thread",
+})
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str) -> None:
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+        self.method = method
+        self.path = path
+        self.status: int | None = None
+        self.started_at = datetime.utcnow()
+        self.total = 0.0
+        self.timings = {category: {"count": 0, "seconds": 0.0} for category in CATEGORIES}
+
+    def add(self, category: str, seconds: float) -> None:
+        entry = self.timings[category]
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+    def summary(self) -> dict:
+        timings = {name: {**entry, "seconds": round(entry["seconds"], 6)} for name, entry in self.timings.items()}
+        accounted = sum(entry["seconds"] for entry in self.timings.values())
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "total_seconds": round(self.total, 6),
+            "timings": timings,
+            # Python code, waiting for the client, event-loop scheduling…
+            "other_seconds": round(max(0.0, self.total - accounted), 6),
+        }
+
+
+# Profile of the request being handled; copied into threadpool calls with the context
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def record_timing(category: str, seconds: float) -> None:
+    """Count ``seconds`` of ``category`` work towards the profiled request, if any."""
+    profile = _current.get()
+    if profile is not None:
+        profile.add(category, seconds)
+
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+class StackSampler:
+    """Background thread counting the folded stacks of every other thread."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_frames(self, limit: int = 30) -> list[dict]:
+        """Busy leaf frames by share of samples (self time)."""
+        leaves: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            if leaf not in _IDLE_FRAMES:
+                leaves[leaf] += count
+        total = sum(leaves.values()) or 1
+        return [{"frame": name, "samples": count, "share": round(count / total, 4)} for name, count in leaves.most_common(limit)]
+
+
+class ProfileStore:
+    """The newest ``keep`` profiles as ``<id>.json`` + ``<id>.folded`` under ``root``."""
+
+    def __init__(self, root: str, keep: int) -> None:
+        self.root = root
+        self.keep = keep
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{os.path.basename(profile_id)}{suffix}")
+
+    def save(self, profile: RequestProfile, sampler: StackSampler) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        data = {
+            **profile.summary(),
+            "sample_interval": sampler.interval,
+            "samples": sampler.samples,
+            "top_frames": sampler.top_frames(),
+        }
+        for suffix, content in ((".folded", sampler.folded()), (".json", json.dumps(data, ensure_ascii=False))):
+            tmp_path = self._path(profile.id, f"{suffix}.part")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, self._path(profile.id, suffix))
+        self._prune()
+
+    def _prune(self) -> None:
+        for profile_id in self.ids()[self.keep:]:
+            for suffix in (".json", ".folded"):
+                try:
+                    os.remove(self._path(profile_id, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def ids(self) -> list[str]:
+        """Stored profile ids, newest first (ids start with their UTC timestamp)."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted((name.removesuffix(".json") for name in names if name.endswith(".json")), reverse=True)
+
+    def load(self, profile_id: str) -> dict | None:
+        try:
+            with open(self._path(profile_id, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def folded_path(self, profile_id: str) -> str | None:
+        path = self._path(profile_id, ".folded")
+        return path if os.path.exists(path) else None
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_KEEP)
+
+
+class ProfilerMiddleware:
+    """Profiles requests that ask for it when ``authorize(session_cookie)`` allows.
+
+    One profile at a time per worker: a second request asking for a profile
+    meanwhile is served normally.
+    """
+
+    def __init__(self, app: ASGIApp, authorize: Callable[[str | None], bool]) -> None:
+        self.app = app
+        self.authorize = authorize
+        self._busy = threading.Lock()
+
+    def _wants_profile(self, request: Request) -> bool:
+        flag = request.query_params.get("profile") or request.headers.get("x-profile")
+        return flag in ("1", "true", "yes") and self.authorize(request.cookies.get("session"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wants_profile(Request(scope)) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = _current.set(profile)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.total = time.perf_counter() - started
+            sampler.stop()
+            _current.reset(token)
+            try:
+                profile_store.save(profile, sampler)
+            finally:
+                self._busy.release()
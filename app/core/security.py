@@ -1,9 +1,13 @@
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, Cookie, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from itsdangerous import TimestampSigner, BadSignature, SignatureExpired
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal
 from app.models.user import User
 
 
@@ -23,11 +27,68 @@ def _verify_session_cookie(value: str) -> str | None:
         return None
 
 
-async def get_current_user(
-    session: str | None = Cookie(None, alias="session"),
-    db: Session = Depends(get_db),
-) -> User:
-    """Dependency to fetch user by signed session cookie."""
+def is_admin_session(session: str | None) -> bool:
+    """Whether a session cookie value belongs to an admin; no DB access (used by middleware)."""
+    login = _verify_session_cookie(session) if session else None
+    return login is not None and is_admin_login(login)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """User resolved from the session cookie; cached per worker, never attached to a DB session."""
+
+    id: int
+    login: str
+    is_admin: bool
+
+
+# login -> CurrentUser
+user_cache = TTLCache("users", ttl=settings.USER_CACHE_TTL)
+
+
+def is_admin_login(login: str) -> bool:
+    return login in settings.admin_logins
+
+
+async def _load_user(login: str) -> CurrentUser:
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.login == login))
+        if not user:
+            # Should not normally happen – create record lazily
+            user = User(login=login, is_admin=is_admin_login(login))  # login already normalized when session issued
+            db.add(user)
+            await db.commit()
+        return CurrentUser(id=user.id, login=user.login, is_admin=is_admin_login(login))
+
+
+def invalidate_user(login: str | None = None) -> None:
+    """Drop a cached user (or all of them) after its roles or record changed."""
+    if login is None:
+        user_cache.clear()
+    else:
+        user_cache.invalidate(login)
+
+
+def sync_admin_flags(db: Session) -> None:
+    """Bring ``users.is_admin`` in line with ``ADMIN_LOGINS``; runs at startup, not per request."""
+    admins = settings.admin_logins
+    granted = db.query(User).filter(User.login.in_(admins), User.is_admin.isnot(True)).update(
+        {User.is_admin: True}, synchronize_session=False
+    )
+    revoked = db.query(User).filter(User.login.notin_(admins), User.is_admin.is_(True)).update(
+        {User.is_admin: False}, synchronize_session=False
+    )
+    db.commit()
+    if granted or revoked:
+        invalidate_user()
+
+
+async def get_current_user(session: str | None = Cookie(None, alias="session")) -> CurrentUser:
+    """Dependency resolving the user of the signed session cookie.
+
+    Roles come from the settings; the user row is read only on a cache miss, so
+    most authenticated requests do not touch the database.
+    """
 
     if not session:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
@@ -36,31 +97,18 @@ async def get_current_user(
     if not login:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session")
 
-    user = db.query(User).filter(User.login == login).first()
-    if not user:
-        # Should not normally happen – create record lazily
-        user = User(login=login)  # login already normalized when session issued
-        db.add(user)
-
-    # ensure admin flag sync with settings each time
-    expected_admin = login in settings.ADMIN_LOGINS.split(",") if settings.ADMIN_LOGINS else False
-    if bool(user.is_admin) != expected_admin:
-        setattr(user, "is_admin", expected_admin)
-        db.commit()
-
-    return user
+    return await user_cache.get_or_load(login, lambda: _load_user(login))
 
 
-def admin_required(current_user: User = Depends(get_current_user)) -> User:
-    if not bool(current_user.is_admin):
+def admin_required(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return current_user 
 
 
 # Reviewer dependency
-def reviewer_required(current_user: User = Depends(get_current_user)) -> User:
-    reviewers = settings.REVIEWER_LOGINS.split(",") if settings.REVIEWER_LOGINS else []
-    if current_user.login not in reviewers and not bool(current_user.is_admin):
+def reviewer_required(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if current_user.login not in settings.reviewer_logins and not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Reviewer only")
     return current_user
 
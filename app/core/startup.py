@@ -0,0 +1,46 @@
+import importlib
+import logging
+import os
+import time
+from contextlib import contextmanager
+from types import ModuleType
+
+# uvicorn's own logger: its INFO messages are shown with the default log config
+logger = logging.getLogger("uvicorn.error")
+
+
+class StartupReport:
+    """Times the imports of a worker and logs them once the worker is ready.
+
+    Import times are inclusive: the first module importing a shared dependency
+    pays for it.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.imports: list[tuple[str, float]] = []
+
+    @contextmanager
+    def timed(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.imports.append((name, time.perf_counter() - started))
+
+    def import_module(self, name: str) -> ModuleType:
+        with self.timed(name):
+            return importlib.import_module(name)
+
+    def log_ready(self) -> None:
+        total = time.perf_counter() - self.started
+        slowest = sorted(self.imports, key=lambda item: item[1], reverse=True)
+        logger.info(
+            "Worker %s ready in %.0f ms; imports: %s",
+            os.getpid(),
+            total * 1000,
+            ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in slowest),
+        )
+
+
+startup_report = StartupReport()
@@ -1,3 +1,38 @@
+import hashlib
+import os
+import time
+from functools import cache
+
 from fastapi.templating import Jinja2Templates
 
-templates = Jinja2Templates(directory="app/templates") 
\ No newline at end of file
+from app.core.profiling import record_timing
+
+TEMPLATE_DIR = "app/templates"
+
+
+class TimedTemplates(Jinja2Templates):
+    """``Jinja2Templates`` reporting render time to the request profiler."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().TemplateResponse(*args, **kwargs)
+        finally:
+            record_timing("template", time.perf_counter() - started)
+
+
+templates = TimedTemplates(directory=TEMPLATE_DIR)
+
+
+@cache
+def templates_version() -> str:
+    """Digest of all template sources; part of page ETags so a deploy invalidates them."""
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(TEMPLATE_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(path.encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import observe_tracker_call, tracker_operation
+from app.core.profiling import record_timing
+from app.core.tracker_scheduler import parse_retry_after, scheduler
+
+logger = logging.getLogger(__name__)
+
+# Methods that are safe to repeat after the request may have reached Tracker
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_RETRY_STATUSES = frozenset({502, 503, 504})
+# Statuses whose Retry-After pauses every outgoing call of the worker
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TrackerClient:
+    """App-wide asynchronous client for the Yandex Tracker API.
+
+    One keep-alive connection pool per worker; auth headers are built once from
+    settings. The underlying ``httpx.AsyncClient`` is created lazily so it binds to
+    the running event loop, and is closed on application shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        headers = {"Authorization": f"OAuth {settings.TRACKER_TOKEN}"}
+        if settings.TRACKER_ORG_ID:
+            headers["X-Org-ID"] = settings.TRACKER_ORG_ID
+        return httpx.AsyncClient(
+            base_url=settings.TRACKER_API_URL,
+            headers=headers,
+            http2=settings.TRACKER_HTTP2 and _http2_available(),
+            timeout=httpx.Timeout(settings.TRACKER_TIMEOUT, connect=settings.TRACKER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.TRACKER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TRACKER_MAX_CONNECTIONS,
+            ),
+        )
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request to Tracker, retrying transient failures.
+
+        Every attempt first takes a token from the rate limiter in the lane of the
+        current task (see ``tracker_priority``). Connection errors and 429 are
+        retried for every method (the request was not processed); read timeouts
+        and 502/503/504 only for idempotent methods so that an issue is never
+        created twice. A ``Retry-After`` on 429/503 pauses all calls of the worker
+        instead of the exponential backoff.
+        """
+        return await self._send(method, url, stream=False, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def open_stream(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request without reading the body; the caller must ``aclose()`` it."""
+        return await self._send(method, url, stream=True, **kwargs)
+
+    async def _send(self, method: str, url: str, *, stream: bool, **kwargs: Any) -> httpx.Response:
+        method = method.upper()
+        idempotent = method in _IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            await scheduler.acquire()
+            request = self.client.build_request(method, url, **kwargs)
+            try:
+                response = await self._send_once(request, stream)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as exc:
+                if attempt >= settings.TRACKER_RETRIES:
+                    raise
+                logger.warning("Tracker %s %s failed to connect (%s), retrying", method, url, exc)
+            except httpx.ReadTimeout:
+                if not idempotent or attempt >= settings.TRACKER_RETRIES:
+                    raise
+                logger.warning("Tracker %s %s timed out, retrying", method, url)
+            else:
+                status = response.status_code
+                retry_after = None
+                if status in _THROTTLE_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        scheduler.pause(retry_after)
+                retryable = status == 429 or (idempotent and status in _RETRY_STATUSES)
+                if not retryable or attempt >= settings.TRACKER_RETRIES:
+                    return response
+                logger.warning("Tracker %s %s returned %s, retrying", method, url, status)
+                await response.aclose()
+                if retry_after is not None:
+                    attempt += 1
+                    if not scheduler.enabled:
+                        await asyncio.sleep(min(retry_after, settings.TRACKER_RETRY_AFTER_MAX))
+                    # Otherwise the scheduler holds the next attempt until the pause ends
+                    continue
+            attempt += 1
+            await asyncio.sleep(settings.TRACKER_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+    async def _send_once(self, request: httpx.Request, stream: bool) -> httpx.Response:
+        """One attempt, recorded in the Tracker metrics by operation and result."""
+        op = tracker_operation(request.url.path)
+        started = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=stream)
+        except httpx.HTTPError as exc:
+            elapsed = time.perf_counter() - started
+            observe_tracker_call(op, request.method, type(exc).__name__, elapsed)
+            record_timing("tracker", elapsed)
+            raise
+        elapsed = time.perf_counter() - started
+        observe_tracker_call(op, request.method, response.status_code, elapsed)
+        record_timing("tracker", elapsed)
+        return response
+
+    async def execute_transition(
+        self,
+        issue_key: str,
+        match: Callable[[str], bool],
+        payload: dict | None = None,
+    ) -> bool:
+        """Execute the first available transition whose display name satisfies ``match``.
+
+        Returns ``True`` if a matching transition was found and executed.
+        """
+        resp = await self.get(f"/v3/issues/{issue_key}/transitions")
+        if resp.status_code != 200:
+            return False
+        transition = next((t for t in resp.json() if match(t.get("display", "").lower())), None)
+        if not transition:
+            return False
+        exec_resp = await self.post(
+            f"/v3/issues/{issue_key}/transitions/{transition['id']}/_execute",
+            json=payload,
+        )
+        return exec_resp.status_code < 300
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+tracker = TrackerClient()
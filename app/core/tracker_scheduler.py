@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from app.core.config import settings
+from app.core.metrics import tracker_queue_wait, tracker_throttled
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+# Granted in this order: a waiting interactive call always goes first
+LANES = (INTERACTIVE, BULK)
+
+# Lane of the Tracker calls made by the current task; background work sets BULK
+# at the start of its own task so the setting does not leak into requests.
+tracker_lane: ContextVar[str] = ContextVar("tracker_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def tracker_priority(lane: str):
+    """Send the Tracker calls made inside the block through ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane}")
+    token = tracker_lane.set(lane)
+    try:
+        yield
+    finally:
+        tracker_lane.reset(token)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait according to a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TrackerScheduler:
+    """Token-bucket admission of outgoing Tracker calls with priority lanes.
+
+    ``rate`` tokens per second refill a bucket of ``burst``; each call takes one.
+    Calls that find the bucket empty wait in their lane and are released
+    interactive-first as tokens come back. ``pause`` stops all admissions until a
+    ``Retry-After`` deadline, since the quota is shared by every lane. The
+    bucket is per worker, so the effective limit is ``rate`` × workers.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: dict[str, deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """``False`` with ``TRACKER_RATE_LIMIT=0``: calls are admitted at once and pauses are not enforced."""
+        return self.rate > 0
+
+    async def acquire(self, lane: str | None = None) -> None:
+        if not self.enabled:
+            return
+        lane = lane or tracker_lane.get()
+        if not any(self._waiters.values()) and self._try_take():
+            tracker_queue_wait.labels(lane).observe(0)
+            return
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future in self._waiters[lane]:
+                self._waiters[lane].remove(future)
+            raise
+        tracker_queue_wait.labels(lane).observe(time.monotonic() - started)
+
+    def pause(self, seconds: float) -> None:
+        """Admit nothing for ``seconds`` (Tracker asked us to back off)."""
+        seconds = min(seconds, settings.TRACKER_RETRY_AFTER_MAX)
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        tracker_throttled.inc()
+
+    def _try_take(self) -> bool:
+        now = time.monotonic()
+        if now < self._paused_until:
+            return False
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _release(self) -> None:
+        self._timer = None
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                if waiters[0].done():  # cancelled while waiting
+                    waiters.popleft()
+                    continue
+                if not self._try_take():
+                    self._schedule()
+                    return
+                waiters.popleft().set_result(None)
+
+    def _schedule(self) -> None:
+        if self._timer is not None or not any(self._waiters.values()):
+            return
+        now = time.monotonic()
+        delay = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0.0)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+
+scheduler = TrackerScheduler(settings.TRACKER_RATE_LIMIT, settings.TRACKER_RATE_BURST)
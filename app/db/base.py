@@ -3,4 +3,9 @@ from app.db.base_class import Base  # noqa: F401
 # Import all models here so that Alembic/FastAPI sees them
 from app.models import report  # noqa: F401
 from app.models import user  # noqa: F401 
-from app.models import task  # noqa: F401 
\ No newline at end of file
+from app.models import task  # noqa: F401
+from app.models import job  # noqa: F401
+from app.models import outbox  # noqa: F401
+from app.models import rollup  # noqa: F401
+from app.models import report_details  # noqa: F401
+from app.models import upload  # noqa: F401
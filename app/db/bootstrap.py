@@ -0,0 +1,40 @@
+"""One-shot schema bootstrap, run once per deployment before the workers start::
+
+    python -m app.db.bootstrap
+
+Creates missing tables, applies additive changes (``sync_schema``), mirrors
+``ADMIN_LOGINS`` into ``users.is_admin``, backfills report rollups, purges
+unreferenced upload bodies and empties the Prometheus multiprocess directory of
+the previous run. Every step is idempotent, so running it on an up-to-date
+database is harmless.
+"""
+import logging
+import time
+
+from app.core.metrics import clear_multiprocess_dir
+from app.core.security import sync_admin_flags
+from app.db.base import Base
+from app.db.migrate import sync_schema
+from app.db.session import SessionLocal, engine
+from app.services.rollups import backfill_rollups
+from app.services.uploads import purge_unreferenced_blobs
+
+logger = logging.getLogger(__name__)
+
+
+def bootstrap() -> None:
+    started = time.perf_counter()
+    # Simple approach without Alembic
+    Base.metadata.create_all(bind=engine)
+    sync_schema(engine)
+    with SessionLocal() as db:
+        sync_admin_flags(db)
+    backfill_rollups()
+    purge_unreferenced_blobs()
+    clear_multiprocess_dir()
+    logger.info("Database bootstrap finished in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    bootstrap()
@@ -0,0 +1,51 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+# Columns made NOT NULL on the model after rows without a value existed:
+# (table, column, value stored in those rows). The database constraint itself
+# is not altered; new rows always get a value from the model.
+_NOT_NULL_BACKFILLS = (
+    ("reports", "created_at", datetime(1970, 1, 1)),  # legacy rows without a date; keyset pagination needs one
+)
+
+
+def sync_schema(engine: Engine) -> None:
+    """Apply additive model changes that ``create_all`` skips for existing tables.
+
+    The project has no Alembic: new nullable columns and new indexes declared on
+    the models are added to tables that already exist. Nothing is ever dropped
+    or altered; rows left without a value in a column the model now requires
+    are filled in (``_NOT_NULL_BACKFILLS``).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.error("Cannot add NOT NULL column %s.%s automatically", table.name, column.name)
+                    continue
+                ddl = column.type.compile(dialect=engine.dialect)
+                logger.info("Adding column %s.%s %s", table.name, column.name, ddl)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl}'))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for table_name, column_name, value in _NOT_NULL_BACKFILLS:
+            if not inspector.has_table(table_name):
+                continue
+            filled = conn.execute(
+                text(f"UPDATE {table_name} SET {column_name} = :value WHERE {column_name} IS NULL"), {"value": value}
+            ).rowcount
+            if filled:
+                logger.warning("Filled %s.%s in %s rows that had none", table_name, column_name, filled)
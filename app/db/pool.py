@@ -0,0 +1,69 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import db_pool_checkout_wait
+
+
+class PoolWaitStats:
+    """How long connection checkouts waited for a free pooled connection."""
+
+    # Checkouts slower than this are counted as having waited for the pool
+    WAIT_THRESHOLD = 0.001
+
+    def __init__(self, engine: str) -> None:
+        self.engine = engine
+        self.checkouts = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        if seconds >= self.WAIT_THRESHOLD:
+            self.waited += 1
+        db_pool_checkout_wait.labels(self.engine).observe(seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "waited": self.waited,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else None,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+def timed_pool_class(base: type[QueuePool], stats: PoolWaitStats) -> type[QueuePool]:
+    """Subclass of ``base`` recording checkout waits into ``stats``.
+
+    ``stats`` lives on the class, so it survives ``engine.dispose()``, which
+    replaces the pool instance.
+    """
+
+    class TimedPool(base):  # type: ignore[valid-type, misc]
+        wait_stats = stats
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except PoolTimeoutError:
+                self.wait_stats.timeouts += 1
+                raise
+            self.wait_stats.record(time.perf_counter() - started)
+            return conn
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+sync_pool_stats = PoolWaitStats("sync")
+async_pool_stats = PoolWaitStats("async")
+
+TimedQueuePool = timed_pool_class(QueuePool, sync_pool_stats)
+TimedAsyncQueuePool = timed_pool_class(AsyncAdaptedQueuePool, async_pool_stats)
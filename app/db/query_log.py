@@ -0,0 +1,137 @@
+"""Per-request SQL accounting, slow-query log and N+1 warnings.
+
+``record_query`` is called by the engine hooks in ``app.db.session`` after
+every statement. Within a request (``QueryStatsMiddleware``) statements are
+counted and timed; with ``DEBUG`` the totals are sent as ``X-DB-Query-Count``
+and ``X-DB-Time-Ms`` headers, and a statement repeated ``DB_N_PLUS_ONE_THRESHOLD``
+times in one request is logged as a probable N+1. Statements slower than
+``DB_SLOW_QUERY_THRESHOLD`` are logged with their parameters and plan.
+"""
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PARAMS_LOG_LIMIT = 500  # characters of bound parameters in a slow-query record
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+# Statements of the request being handled
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+# Process-wide collectors of ``assert_max_queries`` blocks (see there)
+_collectors: list[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+
+def _explain(conn, statement: str, parameters) -> str | None:
+    """Plan of a slow SELECT, fetched on the same connection; ``None`` when unavailable."""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN" if conn.dialect.name == "sqlite" else "EXPLAIN"
+    conn.info["explaining"] = True
+    try:
+        rows = conn.exec_driver_sql(f"{prefix} {statement}", parameters).all()
+    except Exception as exc:  # the plan is best effort, never fail the request for it
+        return f"unavailable: {exc}"
+    finally:
+        conn.info["explaining"] = False
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+def record_query(conn, statement: str, parameters, seconds: float, executemany: bool) -> None:
+    """Account one executed statement; called from the ``after_cursor_execute`` hook."""
+    if conn.info.get("explaining"):
+        return
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, seconds)
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.add(statement, seconds)
+    threshold = settings.DB_SLOW_QUERY_THRESHOLD
+    if threshold and seconds >= threshold:
+        plan = None if executemany else _explain(conn, statement, parameters)
+        logger.warning(
+            "Slow query (%.0f ms): %s\nParameters: %.*s\nPlan:\n%s",
+            seconds * 1000, statement, _PARAMS_LOG_LIMIT, repr(parameters), plan or "—",
+        )
+
+
+class QueryStatsMiddleware:
+    """Collects the statements of each HTTP request; see the module docstring."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            for statement, count in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+                logger.warning(
+                    "Probable N+1 in %s %s: statement executed %s times: %s",
+                    scope["method"], scope["path"], count, statement,
+                )
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail with ``AssertionError`` if more than ``limit`` statements run inside the block.
+
+    Counts statements of every thread and task of the process, so it works
+    around ``TestClient`` calls as well as direct service calls::
+
+        with assert_max_queries(3):
+            client.get("/admin")
+    """
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+    if stats.count > limit:
+        listing = "\n".join(f"  {count}× {statement}" for statement, count in stats.statements.most_common())
+        raise AssertionError(f"{stats.count} queries executed, at most {limit} expected:\n{listing}")
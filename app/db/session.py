@@ -1,21 +1,111 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import db_pool_checked_out, db_query_duration
+from app.core.profiling import record_timing
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool, async_pool_stats, sync_pool_stats
+from app.db.query_log import record_query
+
+_POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": True,
+}
+
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url() -> str:
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername=f"{url.get_backend_name()}+{_ASYNC_DRIVERS[url.get_backend_name()]}").render_as_string(
+        hide_password=False
+    )
+
 
-# Engine & SessionFactory
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# Engine & SessionFactory. The sync engine serves threadpool (plain ``def``)
+# endpoints and bootstrap; ``async def`` endpoints and the background loops
+# (job runner, outbox, reconciler) use the async one.
+engine = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **_POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Auto-create tables (simple approach without Alembic)
-from app.db.base import Base  # noqa: E402
+async_engine = create_async_engine(async_database_url(), poolclass=TimedAsyncQueuePool, **_POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _instrument(sync_engine, name: str) -> None:
+    """Feed statement latency and pool occupancy of ``sync_engine`` into the metrics and query log."""
+    checked_out = db_pool_checked_out.labels(name)
+    query_duration = db_query_duration.labels(name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        query_duration.observe(elapsed)
+        record_timing("db", elapsed)
+        record_query(conn, statement, parameters, elapsed, executemany)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+
+_instrument(engine, "sync")
+_instrument(async_engine.sync_engine, "async")
 
-Base.metadata.create_all(bind=engine)
 
 def get_db():
-    """FastAPI dependency that yields a database session and closes it afterwards."""
+    """FastAPI dependency that yields a database session and closes it afterwards.
+
+    For plain ``def`` endpoints, which FastAPI runs in its threadpool.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an ``AsyncSession`` for ``async def`` endpoints.
+
+    Queries await the network instead of blocking the event loop. Synchronous
+    service helpers taking a ``Session`` run through ``await db.run_sync(helper, ...)``.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats() -> dict[str, dict]:
+    """Pool occupancy and checkout-wait counters of both engines in this worker."""
+    stats = {}
+    for name, eng, waits in (("sync", engine, sync_pool_stats), ("async", async_engine, async_pool_stats)):
+        pool = eng.pool
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            **waits.as_dict(),
+        }
+    return stats
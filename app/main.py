@@ -1,16 +1,50 @@
+from app.core.startup import startup_report  # first: worker boot is measured from here
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.session import engine
-from app.db.base import Base
-from app.routers import auth, dashboard, reports, admin, files, employee, admin_batch
 from fastapi.responses import RedirectResponse, JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi import Request
-# Create DB tables (if they do not exist)
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Project Tracker", openapi_url="/openapi.json", docs_url="/docs")
+with startup_report.timed("app.db"):
+    from app.db import base  # noqa: F401  (registers every model)
+    from app.db.session import async_engine
+from app.core.metrics import MetricsMiddleware, mark_worker_dead, metrics_response
+from app.core.profiling import ProfilerMiddleware
+from app.core.security import is_admin_session
+from app.db.query_log import QueryStatsMiddleware
+from app.core.tracker import tracker
+with startup_report.timed("app.services"):
+    from app.services import issues  # noqa: F401  (registers job handlers)
+    from app.services.jobs import runner
+    from app.services.outbox import dispatcher
+    from app.services.task_sync import reconciler
+
+ROUTERS = ("auth", "dashboard", "reports", "admin", "files", "employee", "admin_batch", "admin_jobs", "admin_profiles", "webhooks")
+# Tables are created by ``python -m app.db.bootstrap``, once per deployment
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resumes unfinished jobs left by a previous run
+    runner.start()
+    dispatcher.start()
+    reconciler.start()
+    startup_report.log_ready()
+    yield
+    await reconciler.stop()
+    await dispatcher.stop()
+    await runner.stop()
+    # Close pooled keep-alive connections to Tracker
+    await tracker.aclose()
+    await async_engine.dispose()
+    mark_worker_dead()
+
+
+app = FastAPI(title="Project Tracker", openapi_url="/openapi.json", docs_url="/docs", lifespan=lifespan)
 app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -18,19 +52,20 @@ app.add_middleware(
         allow_methods=["*"],
         allow_headers=["*"],
     )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ProfilerMiddleware, authorize=is_admin_session)
+app.add_middleware(MetricsMiddleware)
 # Register routers
-app.include_router(auth.router)
-app.include_router(dashboard.router)
-app.include_router(reports.router)
-app.include_router(admin.router)
-app.include_router(files.router)
-app.include_router(employee.router)
-app.include_router(admin_batch.router)
+for name in ROUTERS:
+    app.include_router(startup_report.import_module(f"app.routers.{name}").router)
 
 # Static assets
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.mount("/uploaded_files", StaticFiles(directory="uploaded_files"), name="uploaded_files")
 
+app.add_route("/metrics", metrics_response, include_in_schema=False)
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Simple health check endpoint used by reverse proxies and container orchestrators."""
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class Job(Base):
+    """Long-running admin operation executed by the in-process job runner."""
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued | running | done | failed
+    payload = Column(JSON, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    results = Column(JSON, nullable=True)  # per-item results, same order as payload items
+    error = Column(String, nullable=True)
+    worker = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class OutboxMessage(Base):
+    """One Tracker side effect of a report submission, executed by the outbox dispatcher."""
+
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), index=True, nullable=False)
+    seq = Column(Integer, nullable=False)  # execution order within the report
+    kind = Column(String, nullable=False)  # comment | attachment | transition
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    done_at = Column(DateTime, nullable=True)
+
+    report = relationship("Report", back_populates="outbox")
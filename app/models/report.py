@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from app.db.base_class import Base
@@ -6,6 +7,10 @@ from app.db.base_class import Base
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        # Admin list pagination and date-range filters
+        Index("ix_reports_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, index=True, nullable=True)
@@ -13,7 +18,18 @@ class Report(Base):
     projects_in_program = Column(Integer, nullable=True)
     new_scientists_employed = Column(Integer, nullable=True)
     file_path = Column(String, nullable=True)
+    file_name = Column(String, nullable=True)  # download name of the archived file at file_path
     issue_key = Column(String, nullable=True)
     attachment_id = Column(String, nullable=True)
     attachment_name = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow) 
\ No newline at end of file
+    department = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sync_status = Column(String, nullable=True)  # pending | synced | failed; None for legacy rows
+    # Set on every ORM update (sync state, Tracker attachment); with max(id) it versions the admin list
+    updated_at = Column(DateTime, nullable=True, index=True, onupdate=datetime.utcnow)
+
+    outbox = relationship("OutboxMessage", back_populates="report", order_by="OutboxMessage.seq")
+    # Extended-form details; written with bulk inserts, so no back-populating relationships
+    publications = relationship("ReportPublication", order_by="ReportPublication.position", viewonly=True)
+    programs = relationship("ReportProgram", order_by="ReportProgram.position", viewonly=True)
+    events = relationship("ReportEvent", order_by="ReportEvent.position", viewonly=True)
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+
+from app.db.base_class import Base
+
+
+class ReportPublication(Base):
+    """Publication listed in an extended-form report."""
+
+    __tablename__ = "report_publications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), index=True, nullable=False)
+    position = Column(Integer, nullable=False)  # order within the form
+    title = Column(String, nullable=False)
+    doi = Column(String, index=True, nullable=True)
+    relation = Column(String, nullable=True)
+
+
+class ReportProgram(Base):
+    """Education program listed in an extended-form report."""
+
+    __tablename__ = "report_programs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), index=True, nullable=False)
+    position = Column(Integer, nullable=False)
+    name = Column(String, nullable=False)
+    kind = Column(String, index=True, nullable=True)
+    priority = Column(String, nullable=True)
+
+
+class ReportEvent(Base):
+    """Event listed in an extended-form report."""
+
+    __tablename__ = "report_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), index=True, nullable=False)
+    position = Column(Integer, nullable=False)
+    event_type = Column(String, index=True, nullable=False)
+    topic = Column(String, nullable=True)
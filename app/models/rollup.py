@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class ReportRollup(Base):
+    """Report totals per period × user × department, updated on every report insert."""
+
+    __tablename__ = "report_rollups"
+    __table_args__ = (
+        UniqueConstraint("period", "period_start", "username", "department", name="uq_report_rollups_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String, nullable=False)  # day | week | month
+    period_start = Column(Date, nullable=False)  # first day of the period (weeks start on Monday)
+    username = Column(String, nullable=False)
+    department = Column(String, nullable=False, default="")  # "" when not given, so the key stays unique
+    reports_count = Column(Integer, nullable=False, default=0)
+    programs_supported = Column(Integer, nullable=False, default=0)
+    projects_in_program = Column(Integer, nullable=False, default=0)
+    new_scientists_employed = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -13,4 +13,11 @@ class Task(Base):
     assignee = Column(String, index=True, nullable=False)
     summary = Column(String, nullable=False)
     form_type = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow) 
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Mirror of the Tracker issue status (webhook + periodic reconciliation)
+    status = Column(String, nullable=True)  # status key, e.g. "inProgress"
+    status_display = Column(String, nullable=True)
+    status_changed_at = Column(DateTime, nullable=True)
+    synced_at = Column(DateTime, nullable=True)  # None = unknown, ask Tracker
+    reconcile_locked_until = Column(DateTime, nullable=True)  # lease of a worker reconciling the task
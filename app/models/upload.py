@@ -0,0 +1,33 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class UploadBlob(Base):
+    """A file body in the content-addressed upload store, shared by every upload with the same SHA-256."""
+
+    __tablename__ = "upload_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    # Pending outbox steps and archived report files referencing the body
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)  # unreferenced bodies are purged after a grace period
+
+
+class TrackerAttachment(Base):
+    """Tracker attachment already holding a given body on an issue; re-attaching it is skipped."""
+
+    __tablename__ = "tracker_attachments"
+    __table_args__ = (
+        UniqueConstraint("issue_key", "sha256", name="uq_tracker_attachments_issue_sha"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    issue_key = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    attachment_id = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
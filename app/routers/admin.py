@@ -1,57 +1,124 @@
 import logging
-import tempfile
 from datetime import datetime, date as date_type
 
-import requests
-from docx import Document
-from fastapi import APIRouter, Depends, Request, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, Header, Request, HTTPException, Query, Body, status
 from fastapi.responses import HTMLResponse, FileResponse
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from openpyxl import Workbook
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db, pool_stats
 from app.models.report import Report
-from app.core.templates import templates
+from app.core.etag import not_modified, page_headers, weak_etag
+from app.core.templates import templates, templates_version
 from app.core.security import admin_required
 from app.models.user import User
 from pydantic import BaseModel
 from app.core.security import normalize_login
+from app.core.tracker import tracker
+from app.core.cache import cache_stats
+from app.services.jobs import enqueue_job
+from app.services.exports import EXPORT_FORMATS, export_cache, export_filename, filter_by_date
+from app.services.outbox import dispatcher, retry_failed_steps, sync_state
+from app.services.rollups import rollup_stats
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
 
+# Columns rendered by admin.html; rows are loaded as tuples, not ORM objects
+_ADMIN_LIST_COLUMNS = (
+    Report.id,
+    Report.username,
+    Report.programs_supported,
+    Report.projects_in_program,
+    Report.new_scientists_employed,
+    Report.created_at,
+    Report.file_path,
+    Report.issue_key,
+    Report.sync_status,
+)
+
+
+def _parse_date(value: str | None) -> date_type | None:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _encode_cursor(row) -> str:
+    return f"{row.created_at.isoformat()}_{row.id}"
+
+
+def _decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+    try:
+        created_at, report_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(report_id)
+    except ValueError:
+        return None
+
+
+def admin_list_stmt(date_from: date_type | None, date_to: date_type | None, cursor: tuple[datetime, int] | None):
+    """One page (plus one row, to detect the next page) of the admin reports list."""
+    stmt = filter_by_date(select(*_ADMIN_LIST_COLUMNS), date_from, date_to)
+    if cursor:
+        stmt = stmt.where(tuple_(Report.created_at, Report.id) < cursor)
+    # Сортируем по дате создания (самые новые сверху)
+    return stmt.order_by(Report.created_at.desc(), Report.id.desc()).limit(settings.ADMIN_PAGE_SIZE + 1)
+
+
+async def _list_watermark(db: AsyncSession) -> tuple:
+    """Changes whenever a report is added or updated (e.g. its sync state).
+
+    Two index lookups, independent of the date range: any change invalidates
+    every cached list page, which is cheap compared with scanning the range.
+    Reports are never deleted.
+    """
+    # Separate subqueries: each MAX is then answered from its index alone
+    stmt = select(
+        select(func.max(Report.id)).scalar_subquery(),
+        select(func.max(Report.updated_at)).scalar_subquery(),
+    )
+    return tuple((await db.execute(stmt)).one())
+
+
 @router.get("/admin", response_class=HTMLResponse)
 async def admin_page(
     request: Request,
     date_from: str | None = Query(None, alias="from"),
     date_to: str | None = Query(None, alias="to"),
-    db: Session = Depends(get_db),
+    before: str | None = Query(None),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(admin_required),
 ):
-    """Render admin dashboard with reports list."""
-    query = db.query(Report)
-    if date_from:
-        try:
-            start_dt = datetime.strptime(date_from, "%Y-%m-%d")
-            query = query.filter(Report.created_at >= start_dt)
-        except ValueError:
-            pass
-
-    if date_to:
-        try:
-            end_dt = datetime.strptime(date_to, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-            query = query.filter(Report.created_at <= end_dt)
-        except ValueError:
-            pass
-
-    # Сортируем по дате создания (самые новые сверху)
-    query = query.order_by(Report.created_at.desc())
-
-    reports = query.all()
+    """Render admin dashboard with one page of the reports list.
+
+    Newest reports first, paginated by keyset on ``(created_at, id)``: ``before``
+    is the cursor of the last row of the previous page. A cheap watermark query
+    decides whether the browser's copy (``If-None-Match``) is still current.
+    """
+    watermark = await _list_watermark(db)
+    etag = weak_etag("admin.html", templates_version(), date_from, date_to, before, *watermark)
+    if (cached := not_modified(etag, if_none_match)) is not None:
+        return cached
+
+    stmt = admin_list_stmt(_parse_date(date_from), _parse_date(date_to), _decode_cursor(before))
+    reports = (await db.execute(stmt)).all()
+    summary = await db.run_sync(
+        rollup_stats, "day", _parse_date(date_from), _parse_date(date_to), group_by="department", split_periods=False
+    )
+    next_cursor = None
+    if len(reports) > settings.ADMIN_PAGE_SIZE:
+        reports = reports[: settings.ADMIN_PAGE_SIZE]
+        next_cursor = _encode_cursor(reports[-1])
     return templates.TemplateResponse(
         "admin.html",
         {
@@ -59,20 +126,31 @@ async def admin_page(
             "reports": reports,
             "from": date_from,
             "to": date_to,
+            "before": before,
+            "next_cursor": next_cursor,
+            "summary": summary,
         },
+        headers=page_headers(etag),
     )
 
 
+@router.get("/admin/stats")
+async def get_report_stats(
+    period: str = Query("month", pattern="^(day|week|month)$"),
+    group_by: str | None = Query(None, alias="by", pattern="^(user|department)$"),
+    date_from: date_type | None = Query(None, alias="from"),
+    date_to: date_type | None = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(admin_required),
+):
+    """Report totals per period (and user or department), read from the rollup table only."""
+    return await db.run_sync(rollup_stats, period, date_from, date_to, group_by=group_by)
+
+
 @router.get("/tracker/queues")
 async def list_queues(_=Depends(admin_required)):
     """Вернуть список очередей, доступных пользователю в Яндекс.Трекере."""
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-        "Content-Type": "application/json",
-    }
-
-    resp = requests.get("https://api.tracker.yandex.net/v3/queues", headers=headers)
+    resp = await tracker.get("/v3/queues")
     if resp.status_code != 200:
         raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
@@ -86,13 +164,13 @@ class CreateTasksRequest(BaseModel):
     assignees: list[str]
 
 
-@router.post("/admin/create-tasks")
+@router.post("/admin/create-tasks", status_code=status.HTTP_202_ACCEPTED)
 async def create_tasks_in_tracker(
     payload: CreateTasksRequest = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(admin_required),
 ):
-    """Create predefined tasks in Yandex Tracker for given assignees."""
+    """Enqueue creation of predefined tasks in Yandex Tracker for given assignees."""
 
     queue = payload.queue or settings.TRACKER_QUEUE
     assignees = payload.assignees or ["yakovleva.sv"]
@@ -110,48 +188,29 @@ async def create_tasks_in_tracker(
         "Отправка итогового отчета в отдел",
     ]
 
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-        "Content-Type": "application/json",
-    }
-
-    created_issues: list[str] = []
+    issues = []
     for i, text in enumerate(task_texts):
         assignee = assignees[i % len(assignees)]
-        issue_payload = {
+        issues.append({
             "queue": queue,
             "summary": text,
             "description": f"Задача: {text}\n\nПройдите опрос: https://report.siriusuniversity.ru/dashboard/{assignee}",
             "type": "task",
             "priority": {"id": "3"},
             "assignee": assignee,
-        }
-        resp = requests.post("https://api.tracker.yandex.net/v3/issues/", headers=headers, json=issue_payload)
-        if resp.status_code == 201:
-            created_issue = resp.json()
-            issue_key = created_issue["key"]
-            created_issues.append(issue_key)
-
-            # Move issue to "В работу" status if transition available
-            transitions_url = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/transitions"
-            trans_resp = requests.get(transitions_url, headers=headers)
-            if trans_resp.status_code == 200:
-                transitions = trans_resp.json()
-                transition = next((t for t in transitions if t["display"].lower() == "в работу"), None)
-                if transition:
-                    exec_url = (
-                        f"https://api.tracker.yandex.net/v3/issues/{issue_key}/transitions/{transition['id']}/_execute"
-                    )
-                    requests.post(exec_url, headers=headers, json={"comment": "Статус установлен автоматически"})
-        else:
-            logger.error("Ошибка создания задачи: %s", resp.text)
+        })
 
-    return {
-        "queue": queue,
-        "created": len(created_issues),
-        "issues": created_issues,
-    }
+    job = await db.run_sync(enqueue_job, "create_issues", {"issues": issues}, total=len(issues))
+    return {"queue": queue, "job_id": job.id, "status_url": f"/admin/jobs/{job.id}"}
+
+
+def _export_response(db: Session, extension: str, date_from: date_type | None, date_to: date_type | None):
+    path = export_cache.get_or_build(db, extension, date_from, date_to)
+    return FileResponse(
+        path=path,
+        filename=export_filename(extension, date_from, date_to),
+        media_type=EXPORT_FORMATS[extension][1],
+    )
 
 
 @router.get("/admin/export/word")
@@ -162,36 +221,7 @@ def export_word(
     _=Depends(admin_required),
 ):
     """Export reports to a Word (.docx) file."""
-    query = db.query(Report)
-    if date_from:
-        query = query.filter(func.date(Report.created_at) >= date_from)
-    if date_to:
-        query = query.filter(func.date(Report.created_at) <= date_to)
-    reports = query.all()
-
-    doc = Document()
-    doc.add_heading("Отчеты пользователей", 0)
-
-    for report in reports:
-        doc.add_paragraph(
-            f"ID: {report.id}\nПользователь: {report.username}\nПрограмм поддержано: {report.programs_supported}\n"
-            f"Проектов в программе: {report.projects_in_program}\nНовых ученых: {report.new_scientists_employed}\n",
-            style="Normal",
-        )
-        doc.add_paragraph("------------------------------")
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-        doc.save(tmp.name)
-        if date_from or date_to:
-            fname_range = f"{date_from or 'all'}_{date_to or 'all'}"
-        else:
-            fname_range = "all"
-        filename = f"reports_{fname_range}.docx"
-        return FileResponse(
-            path=tmp.name,
-            filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
+    return _export_response(db, "docx", date_from, date_to)
 
 
 @router.get("/admin/export/excel")
@@ -201,84 +231,86 @@ def export_excel(
     db: Session = Depends(get_db),
     _=Depends(admin_required),
 ):
-    """Export reports to an Excel (.xlsx) file."""
-
-    query = db.query(Report)
-    if date_from:
-        query = query.filter(func.date(Report.created_at) >= date_from)
-    if date_to:
-        query = query.filter(func.date(Report.created_at) <= date_to)
-    reports = query.all()
-
-    wb = Workbook()
-    ws = wb.active  # type: ignore[assignment]
-    ws.title = "Отчёты"  # type: ignore[attr-defined]
-
-    # header
-    headers = [
-        "ID",
-        "Пользователь",
-        "Поддержано программ",
-        "Проектов в программе",
-        "Новых учёных",
-        "Дата создания",
-    ]
-    ws.append(headers)  # type: ignore[arg-type]
-
-    for rpt in reports:
-        ws.append([  # type: ignore[arg-type]
-            rpt.id,
-            rpt.username,
-            rpt.programs_supported,
-            rpt.projects_in_program,
-            rpt.new_scientists_employed,
-            rpt.created_at.strftime("%Y-%m-%d %H:%M"),
-        ])
-
-    # autosize columns
-    for col in ws.columns:  # type: ignore[attr-defined]
-        max_len = max(len(str(cell.value)) if cell.value is not None else 0 for cell in col)
-        ws.column_dimensions[col[0].column_letter].width = max_len + 2  # type: ignore[attr-defined]
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        wb.save(tmp.name)
-        if date_from or date_to:
-            fname_range = f"{date_from or 'all'}_{date_to or 'all'}"
-        else:
-            fname_range = "all"
-        filename = f"reports_{fname_range}.xlsx"
-        return FileResponse(
-            path=tmp.name,
-            filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+    """Export reports to an Excel (.xlsx) file.
+
+    Rows are read in batches and written in openpyxl write-only mode, so memory
+    use does not depend on the number of reports. The file is reused until a
+    report in the range is added or removed.
+    """
+    return _export_response(db, "xlsx", date_from, date_to)
+
+
+@router.get("/admin/reports/{report_id}/sync")
+async def get_report_sync(report_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(admin_required)):
+    """Per-step state of the Tracker side effects of a report."""
+    report = await db.get(Report, report_id, options=[selectinload(Report.outbox)])
+    if report is None:
+        raise HTTPException(status_code=404, detail="Отчёт не найден")
+    return sync_state(report)
+
+
+@router.get("/admin/reports/{report_id}/details")
+async def get_report_details(report_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(admin_required)):
+    """Publications, programs and events of an extended-form report."""
+    report = await db.get(
+        Report,
+        report_id,
+        options=[selectinload(Report.publications), selectinload(Report.programs), selectinload(Report.events)],
+    )
+    if report is None:
+        raise HTTPException(status_code=404, detail="Отчёт не найден")
+    return {
+        "report_id": report.id,
+        "department": report.department,
+        "publications": [
+            {"title": pub.title, "doi": pub.doi, "relation": pub.relation} for pub in report.publications
+        ],
+        "programs": [
+            {"name": prog.name, "kind": prog.kind, "priority": prog.priority} for prog in report.programs
+        ],
+        "events": [{"event_type": event.event_type, "topic": event.topic} for event in report.events],
+    }
+
+
+@router.post("/admin/reports/{report_id}/retry")
+async def retry_report_sync(report_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(admin_required)):
+    """Re-queue failed Tracker steps of a report."""
+    report = await db.get(Report, report_id, options=[selectinload(Report.outbox)])
+    if report is None:
+        raise HTTPException(status_code=404, detail="Отчёт не найден")
+    await db.run_sync(retry_failed_steps, report)
+    await db.commit()
+    dispatcher.wake()
+    return sync_state(report)
+
+
+@router.get("/admin/cache/stats")
+async def get_cache_stats(_=Depends(admin_required)):
+    """Hit/miss counters of in-memory caches of the worker that served the request."""
+    return cache_stats()
+
+
+@router.get("/admin/db/pool")
+async def get_pool_stats(_=Depends(admin_required)):
+    """Connection pool occupancy and checkout waits of the worker that served the request."""
+    return pool_stats()
 
 
 @router.get("/admin/users")
-async def list_users(db: Session = Depends(get_db), _ = Depends(admin_required)):
-    return [u.login for u in db.query(User).all()] 
+async def list_users(db: AsyncSession = Depends(get_async_db), _ = Depends(admin_required)):
+    return list(await db.scalars(select(User.login)))
 
 
 @router.get("/tracker/queues/{queue_key}/users")
 async def list_queue_users(queue_key: str, _=Depends(admin_required)):
     """Вернуть список логинов пользователей (teamUsers) указанной очереди."""
 
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-
     # Берём параметры очереди с teamUsers через expand.
-    url = f"https://api.tracker.yandex.net/v3/queues/{queue_key}?expand=teamUsers"
-    resp = requests.get(url, headers=headers)
+    resp = await tracker.get(f"/v3/queues/{queue_key}", params={"expand": "teamUsers"})
     if resp.status_code != 200:
         # иногда ?expand может не поддерживаться; пробуем expand=all
         if resp.status_code == 400 or resp.status_code == 404:
-            resp2 = requests.get(
-                f"https://api.tracker.yandex.net/v3/queues/{queue_key}?expand=all",
-                headers=headers,
-            )
-            resp = resp2
+            resp = await tracker.get(f"/v3/queues/{queue_key}", params={"expand": "all"})
         if resp.status_code != 200:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
@@ -296,9 +328,7 @@ async def list_queue_users(queue_key: str, _=Depends(admin_required)):
 
         # Если raw_login — числовой идентификатор без имени, пробуем запросить данные пользователя
         if isinstance(raw_login, int) or (isinstance(raw_login, str) and raw_login.isdigit()):
-            user_detail = requests.get(
-                f"https://api.tracker.yandex.net/v3/users/{raw_login}", headers=headers
-            )
+            user_detail = await tracker.get(f"/v3/users/{raw_login}")
             if user_detail.status_code == 200:
                 raw_login = user_detail.json().get("login") or user_detail.json().get("uid") or raw_login
 
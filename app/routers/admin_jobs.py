@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import admin_required
+from app.db.session import get_async_db
+from app.models.job import Job
+from app.services.jobs import job_status
+
+router = APIRouter(prefix="/admin/jobs", tags=["admin-jobs"], dependencies=[Depends(admin_required)])
+
+
+@router.get("/")
+async def list_jobs(limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_async_db)):
+    """Recent jobs without per-item results."""
+    jobs = (await db.scalars(select(Job).order_by(Job.id.desc()).limit(limit))).all()
+    return [{**job_status(job), "results": None} for job in jobs]
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Status, progress counters and per-item results of a job."""
+    job = await db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job_status(job)
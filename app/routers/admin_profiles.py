@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.profiling import profile_store
+from app.core.security import admin_required
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin-profiles"], dependencies=[Depends(admin_required)])
+
+
+@router.get("/")
+async def list_profiles():
+    """Stored request profiles, newest first, without stacks.
+
+    Profile a request by adding ``?profile=1`` (or the ``X-Profile: 1`` header);
+    its id comes back in ``X-Profile-Id``.
+    """
+    profiles = (profile_store.load(profile_id) for profile_id in profile_store.ids())
+    return [
+        {key: value for key, value in profile.items() if key != "top_frames"}
+        for profile in profiles
+        if profile is not None
+    ]
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str):
+    """Timing breakdown (DB, Tracker, templates) and the hottest sampled frames."""
+    profile = profile_store.load(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    return profile
+
+
+@router.get("/{profile_id}/folded")
+async def get_profile_stacks(profile_id: str):
+    """Sampled stacks in the folded format for flamegraph.pl, speedscope or inferno."""
+    path = profile_store.folded_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=f"{profile_id}.folded")
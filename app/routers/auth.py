@@ -1,28 +1,36 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Response, Cookie
+from fastapi import APIRouter, Request, Depends, Header, HTTPException, Response, Cookie
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
 import httpx
 from pydantic import BaseModel
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.report import Report
 from app.models.user import User
-from app.core.templates import templates
-from app.core.security import issue_session_cookie, normalize_login
+from app.core.etag import not_modified, page_headers, weak_etag
+from app.core.templates import templates, templates_version
+from app.core.security import is_admin_login, issue_session_cookie, normalize_login
+from app.core.tracker import tracker
+from app.services.rollups import add_report_to_rollups
 
 router = APIRouter()
 
 
 @router.get("/", response_class=HTMLResponse)
-async def login_page(request: Request):
+async def login_page(request: Request, if_none_match: str | None = Header(None)):
     """Render Yandex OAuth login page with parameters required by YaAuthSuggest."""
 
     # Build the redirect URI for the auxiliary page that receives the OAuth token.
     token_redirect_uri = request.url_for("suggest_token")
     token_redirect_uri = str(token_redirect_uri).replace("http://", "https://")
 
+    etag = weak_etag("login.html", templates_version(), settings.CLIENT_ID, token_redirect_uri)
+    if (cached := not_modified(etag, if_none_match)) is not None:
+        return cached
+
     return templates.TemplateResponse(
         "login.html",
         {
@@ -30,6 +38,7 @@ async def login_page(request: Request):
             "client_id": settings.CLIENT_ID,
             "token_redirect_uri": token_redirect_uri,
         },
+        headers=page_headers(etag),
     )
 
 
@@ -57,7 +66,7 @@ async def auth_code_callback(
     code: str,
     state: str | None = None,
     oauth_state: str | None = Cookie(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Обрабатываем callback, проверяем `state`, получаем токен, сохраняем в cookie."""
 
@@ -85,12 +94,7 @@ async def auth_code_callback(
         raise HTTPException(status_code=400, detail="Не удалось получить токен")
 
     # Получаем информацию о пользователе через Tracker API
-    headers = {
-        "Authorization": f"OAuth {access_token}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-    async with httpx.AsyncClient(timeout=10) as client:
-        user_response = await client.get("https://api.tracker.yandex.net/v3/myself", headers=headers)
+    user_response = await tracker.get("/v3/myself", headers={"Authorization": f"OAuth {access_token}"})
 
     if user_response.status_code != 200:
         raise HTTPException(status_code=401, detail="Invalid token for Tracker")
@@ -101,17 +105,19 @@ async def auth_code_callback(
         raise HTTPException(status_code=400, detail="Unable to retrieve login")
 
     # ensure user exists
-    user = db.query(User).filter(User.login == username).first()
+    user = await db.scalar(select(User).where(User.login == username))
     if not user:
-        user = User(login=username, is_admin=username in settings.ADMIN_LOGINS.split(","))
+        user = User(login=username, is_admin=is_admin_login(username))
         db.add(user)
     # create report user row (legacy) if missing
-    if not db.query(Report).filter(Report.username == username).first():
-        db.add(Report(username=username))
-    db.commit()
+    if await db.scalar(select(Report.id).where(Report.username == username).limit(1)) is None:
+        report = Report(username=username)
+        db.add(report)
+        await db.run_sync(add_report_to_rollups, report)
+    await db.commit()
 
     # Redirect admins to admin dashboard immediately
-    target_url = "/admin" if bool(user.is_admin) else f"/dashboard/{username}"
+    target_url = "/admin" if is_admin_login(username) else f"/dashboard/{username}"
     redirect = RedirectResponse(url=target_url)
     # Создаём подписанную сессию
     issue_session_cookie(redirect, username)
@@ -125,17 +131,12 @@ class TokenLogin(BaseModel):
 
 
 @router.post("/auth/token-login")
-async def token_login(payload: TokenLogin, db: Session = Depends(get_db)):
+async def token_login(payload: TokenLogin, db: AsyncSession = Depends(get_async_db)):
     """Login flow for Yandex JS widget: receives access_token, validates and issues cookie."""
 
     access_token = payload.access_token
     # validate token via Tracker API /myself
-    headers = {
-        "Authorization": f"OAuth {access_token}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get("https://api.tracker.yandex.net/v3/myself", headers=headers)
+    resp = await tracker.get("/v3/myself", headers={"Authorization": f"OAuth {access_token}"})
 
     if resp.status_code != 200:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -145,13 +146,13 @@ async def token_login(payload: TokenLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Unable to retrieve login")
 
     # ensure user exists
-    user = db.query(User).filter(User.login == username).first()
+    user = await db.scalar(select(User).where(User.login == username))
     if not user:
-        user = User(login=username, is_admin=username in settings.ADMIN_LOGINS.split(","))
+        user = User(login=username, is_admin=is_admin_login(username))
         db.add(user)
-        db.commit()
+        await db.commit()
     # Redirect admins to admin dashboard immediately
-    target_url = "/admin" if bool(user.is_admin) else "/dashboard/" + username
+    target_url = "/admin" if is_admin_login(username) else "/dashboard/" + username
     response = RedirectResponse(url=target_url, status_code=303)
     issue_session_cookie(response, username)
     return response
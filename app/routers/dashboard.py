@@ -1,13 +1,14 @@
-from fastapi import APIRouter, HTTPException, Request, Depends, status as http_status
+from fastapi import APIRouter, Header, HTTPException, Request, Depends, status as http_status
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-import requests
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
-from app.db.session import get_db
-from app.core.templates import templates
+from app.db.session import get_async_db
+from app.core.etag import not_modified, page_headers, weak_etag
+from app.core.templates import templates, templates_version
 from app.models.task import Task
 from app.core.security import get_current_user
+from app.services.issue_status import get_issue_status
 
 router = APIRouter()
 
@@ -16,10 +17,15 @@ router = APIRouter()
 async def dashboard(
     username: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
+    if_none_match: str | None = Header(None),
 ):
-    """Display tracker task status for user. Only the owner can access."""
+    """Display tracker task status for user. Only the owner can access.
+
+    The ETag covers everything the page shows; when the status is mirrored in
+    ``tasks`` a matching ``If-None-Match`` is answered without calling Tracker.
+    """
 
     if current_user.login != username:
         raise HTTPException(status_code=http_status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -30,11 +36,8 @@ async def dashboard(
     status_display_val: str | None = None
 
     # Ищем задачи, созданные администратором, в локальной базе
-    task: Task | None = (
-        db.query(Task)
-        .filter(Task.assignee == username)
-        .order_by(Task.created_at.desc())
-        .first()
+    task: Task | None = await db.scalar(
+        select(Task).where(Task.assignee == username).order_by(Task.created_at.desc()).limit(1)
     )
 
     if task is None:
@@ -42,30 +45,33 @@ async def dashboard(
     else:
         issue_key = str(task.issue_key)
 
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-        }
-
-        # Получаем детали задачи для статуса
-    try:
-        resp = requests.get(f"https://api.tracker.yandex.net/v3/issues/{issue_key}", headers=headers)
-        if resp.status_code != 200:
-            raise HTTPException(status_code=500, detail=f"Tracker error: {resp.text}")
+    # Статус зеркалируется в tasks вебхуком Tracker и периодической сверкой;
+    # если он неизвестен, берём из кэша (один запрос к Tracker на ключ за ISSUE_STATUS_CACHE_TTL)
+    if task is not None and task.status and task.synced_at:
+        status = {"key": task.status, "display": task.status_display}
+    elif issue_key:
+        try:
+            status = await get_issue_status(issue_key)
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Ошибка при получении статуса: {exc}") from exc
+    else:
+        status = {}
 
-        issue = resp.json()
-        status = issue.get("status", {})
-        status_display_val = status.get("display") or status.get("name")
-        status_name = (status_display_val or "").lower()
-        # Пользователь не может сдавать отчёт только если задача уже "Закрыта"
-        if status_name in ["in progress", "в работе"]:
-            can_submit = True
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Ошибка при получении статуса: {exc}") from exc
+    status_display_val = status.get("display") or status.get("name")
+    status_name = (status_display_val or "").lower()
+    # Пользователь не может сдавать отчёт только если задача уже "Закрыта"
+    if status.get("key") == "inProgress" or status_name in ["in progress", "в работе"]:
+        can_submit = True
 
     # Всегда используем расширенную форму отчёта
     template_name = "dashboard_extended.html"
 
+    etag = weak_etag(template_name, templates_version(), username, issue_key, can_submit, status_display_val)
+    if (cached := not_modified(etag, if_none_match)) is not None:
+        return cached
+
     return templates.TemplateResponse(
         template_name,
         {
@@ -76,4 +82,5 @@ async def dashboard(
             "issue_not_found": issue_not_found,
             "status_display": status_display_val,
         },
+        headers=page_headers(etag),
     ) 
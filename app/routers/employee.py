@@ -1,30 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+import math
+
+from fastapi import APIRouter, Depends, Header, Query, Request
 from fastapi.responses import HTMLResponse
-from app.core.templates import templates
-import requests
+from app.core.etag import not_modified, page_headers, weak_etag
+from app.core.templates import templates, templates_version
 
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.services.employee_tasks import get_employee_tasks
 
 router = APIRouter(prefix="/employee", tags=["employee"])
 
 
 @router.get("/tasks", response_class=HTMLResponse)
-async def list_tasks(request: Request, current_user = Depends(get_current_user)):
-    """Show list of tasks assigned to current employee from Tracker."""
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-        "Content-Type": "application/json",
-    }
-    query = {
-        "query": f"assignee: {current_user.login} AND queue: {settings.TRACKER_QUEUE} AND status:!closed"
-    }
-    resp = requests.post("https://api.tracker.yandex.net/v3/issues/_search", headers=headers, json=query)
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=resp.text)
-    issues = resp.json()
+async def list_tasks(
+    request: Request,
+    page: int = Query(1, ge=1),
+    current_user = Depends(get_current_user),
+    if_none_match: str | None = Header(None),
+):
+    """Show list of tasks assigned to current employee from Tracker, one page at a time.
+
+    The ETag is computed from the cached task list, so a reload within the cache
+    TTL is answered with 304 without touching Tracker or Jinja.
+    """
+    tasks = await get_employee_tasks(current_user.login)
+    page_size = settings.EMPLOYEE_TASKS_PAGE_SIZE
+    pages = max(1, math.ceil(len(tasks) / page_size))
+    page = min(page, pages)
+    issues = tasks[(page - 1) * page_size : page * page_size]
+    etag = weak_etag(
+        "employee_tasks.html", templates_version(), current_user.login, page, pages, len(tasks),
+        *((i["key"], i["summary"], i["status"]["display"]) for i in issues),
+    )
+    if (cached := not_modified(etag, if_none_match)) is not None:
+        return cached
     return templates.TemplateResponse(
         "employee_tasks.html",
-        {"request": request, "issues": issues, "username": current_user.login},
-    ) 
\ No newline at end of file
+        {
+            "request": request,
+            "issues": issues,
+            "username": current_user.login,
+            "page": page,
+            "pages": pages,
+            "total": len(tasks),
+        },
+        headers=page_headers(etag),
+    )
@@ -1,11 +1,15 @@
 import os
-import requests
-from io import BytesIO
-import zipfile
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from fastapi.responses import StreamingResponse, FileResponse
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.etag import etag_matches
+from app.core.security import admin_required
+from app.core.tracker import tracker
+from app.db.session import get_async_db
+from app.models.report import Report
+from app.services.attachments import attachment_cache, list_attachments, stream_attachments_zip
 
 router = APIRouter()
 
@@ -16,69 +20,69 @@ async def download_file(filename: str):
     file_path = os.path.join("uploaded_files", filename)
     if os.path.exists(file_path):
         return FileResponse(file_path, media_type="application/octet-stream", filename=filename)
-    raise HTTPException(status_code=404, detail="Файл не найден") 
+    raise HTTPException(status_code=404, detail="Файл не найден")
+
+
+@router.get("/files/reports/{report_id}")
+async def download_report_file(report_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(admin_required)):
+    """Return the archived report file (stored under its content hash) with its original name."""
+    report = await db.get(Report, report_id)
+    if report is None or not report.file_path or not os.path.exists(report.file_path):
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    filename = report.file_name or os.path.basename(report.file_path)
+    return FileResponse(report.file_path, media_type="application/octet-stream", filename=filename)
 
 
 # --- Proxy download from Yandex Tracker ---
 
 
 @router.get("/attachments/{issue_key}/{attachment_id}/{filename:path}")
-async def download_tracker_attachment(issue_key: str, attachment_id: str, filename: str):
-    """Proxy file download from Tracker attachments API, preserving auth headers."""
+async def download_tracker_attachment(
+    issue_key: str,
+    attachment_id: str,
+    filename: str,
+    if_none_match: str | None = Header(None),
+):
+    """Proxy file download from Tracker attachments API, preserving auth headers.
 
-    url = (
-        f"https://api.tracker.yandex.net/v3/issues/{issue_key}/attachments/{attachment_id}/{filename}"
-    )
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-    resp = requests.get(url, headers=headers, stream=True)
+    Bodies are served from the local attachment cache when possible (with Range
+    support); the ETag depends only on the attachment id, which Tracker never reuses.
+    """
+    etag = f'"{issue_key}-{attachment_id}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    cached = attachment_cache.lookup(issue_key, attachment_id)
+    if cached is not None:
+        path, meta = cached
+        return FileResponse(path, media_type=meta["content_type"], filename=filename, headers=headers)
+
+    resp = await tracker.open_stream("GET", f"/v3/issues/{issue_key}/attachments/{attachment_id}/{filename}")
     if resp.status_code != 200:
+        await resp.aclose()
         raise HTTPException(status_code=resp.status_code, detail="Не удалось скачать файл")
 
-    return StreamingResponse(resp.iter_content(chunk_size=8192),
+    return StreamingResponse(attachment_cache.tee(resp, issue_key, attachment_id, filename),
                              media_type=resp.headers.get("Content-Type", "application/octet-stream"),
-                             headers={"Content-Disposition": f"attachment; filename={filename}"}) 
+                             headers={**headers, "Content-Disposition": f"attachment; filename={filename}"})
 
 
 @router.get("/attachments/{issue_key}")
 async def list_issue_attachments(issue_key: str):
     """Return list of attachments for given issue from Tracker."""
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-    url = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/attachments"
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail="Не удалось получить список файлов")
-    return resp.json()
+    return await list_attachments(issue_key)
 
 
 @router.get("/attachments/{issue_key}/all.zip")
 async def download_all_attachments_zip(issue_key: str):
-    """Download all attachments of an issue as a single ZIP archive."""
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-    list_url = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/attachments"
-    list_resp = requests.get(list_url, headers=headers)
-    if list_resp.status_code != 200:
-        raise HTTPException(status_code=list_resp.status_code, detail="Не удалось получить список файлов")
-    attachments = list_resp.json()
+    """Download all attachments of an issue as a single ZIP archive streamed while it is built."""
+    attachments = await list_attachments(issue_key)
     if not attachments:
         raise HTTPException(status_code=404, detail="Файлы не найдены")
 
-    memory = BytesIO()
-    with zipfile.ZipFile(memory, "w", zipfile.ZIP_DEFLATED) as zf:
-        for att in attachments:
-            fid = att.get("id")
-            fname = att.get("name") or str(fid)
-            dl_url = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/attachments/{fid}/{fname}"
-            file_resp = requests.get(dl_url, headers=headers)
-            if file_resp.status_code == 200:
-                zf.writestr(fname, file_resp.content)
-    memory.seek(0)
-    return StreamingResponse(memory, media_type="application/zip", headers={"Content-Disposition": f"attachment; filename={issue_key}_attachments.zip"}) 
\ No newline at end of file
+    return StreamingResponse(
+        stream_attachments_zip(issue_key, attachments),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={issue_key}_attachments.zip"},
+    )
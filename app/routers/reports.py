@@ -1,16 +1,20 @@
-import os
 import logging
 
 from fastapi import APIRouter, Depends, Form, UploadFile, File, HTTPException, Request
 from fastapi.responses import HTMLResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import requests
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.report import Report
 from app.core.templates import templates
 from app.models.task import Task
+from app.services.outbox import add_steps, dispatcher
+from app.services.report_details import form_rows, save_report_details
+from app.services.rollups import add_report_to_rollups
+from app.services.uploads import acquire_blob, blob_path, store_upload
 
 logger = logging.getLogger(__name__)
 
@@ -47,35 +51,17 @@ async def submit_form(
     department: str | None = Form(None),
     report_file: UploadFile = File(None),
     description: str | None = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Handle weekly report submission and push it to Tracker."""
+    """Handle weekly report submission and queue its Tracker side effects.
 
-    # Save uploaded file if provided
-    file_path: str | None = None
-    if report_file is not None:
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{username}_{report_file.filename}")
-        with open(file_path, "wb") as f:
-            f.write(await report_file.read())
-
-    # Persist basic info; extended details can be stored later as JSON or separate tables
-    report = Report(
-        username=username,
-        programs_supported=programs_supported or 0,
-        projects_in_program=projects_in_program or 0,
-        new_scientists_employed=new_scientists_employed or 0,
-        file_path=file_path,
-    )
-    db.add(report)
-    db.commit()
+    The report and its outbox steps (comment, attachments, status transition) are
+    committed in one transaction; the outbox dispatcher performs them afterwards.
+    """
 
     # Ищем задачу, созданную администратором, в локальной таблице tasks
-    task: Task | None = (
-        db.query(Task)
-        .filter(Task.assignee == username)
-        .order_by(Task.created_at.desc())
-        .first()
+    task: Task | None = await db.scalar(
+        select(Task).where(Task.assignee == username).order_by(Task.created_at.desc()).limit(1)
     )
 
     if task is None:
@@ -83,11 +69,6 @@ async def submit_form(
 
     issue_key = task.issue_key
 
-    headers = {
-        "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-        "X-Org-ID": settings.TRACKER_ORG_ID,
-    }
-
     comment_lines: list[str] = [f"🔹 Новый отчёт от пользователя {username}:"]
     if programs_supported is not None:
         comment_lines.append(f"- Поддержано программ: {programs_supported}")
@@ -96,100 +77,88 @@ async def submit_form(
     if new_scientists_employed is not None:
         comment_lines.append(f"- Принято новых учёных: {new_scientists_employed}")
 
+    publications = form_rows(("title", pub_title), doi=pub_doi, relation=pub_relation)
+    programs = form_rows(("name", prog_name), kind=prog_kind, priority=prog_priority)
+    events = form_rows(("event_type", event_type), topic=event_topic)
+
     # Publications details
-    if pub_title:
+    if publications:
         comment_lines.append("\n📚 Публикации:")
-        for i, title in enumerate(pub_title):
-            doi = pub_doi[i] if pub_doi and i < len(pub_doi) else ""
-            relation = pub_relation[i] if pub_relation and i < len(pub_relation) else ""
-            comment_lines.append(f"  • {title} (DOI: {doi}) – {relation}")
+        for pub in publications:
+            comment_lines.append(f"  • {pub['title']} (DOI: {pub['doi'] or ''}) – {pub['relation'] or ''}")
 
     # Education programs details
-    if prog_name:
+    if programs:
         comment_lines.append("\n🎓 Образовательные программы:")
-        for i, name in enumerate(prog_name):
-            kind = prog_kind[i] if prog_kind and i < len(prog_kind) else ""
-            priority = prog_priority[i] if prog_priority and i < len(prog_priority) else ""
-            comment_lines.append(f"  • {name} – {kind} – {priority}")
+        for prog in programs:
+            comment_lines.append(f"  • {prog['name']} – {prog['kind'] or ''} – {prog['priority'] or ''}")
 
     # Events details
-    if event_type:
+    if events:
         comment_lines.append("\n📅 Мероприятия:")
-        for i, etype in enumerate(event_type):
-            topic = event_topic[i] if event_topic and i < len(event_topic) else ""
-            comment_lines.append(f"  • {etype}: {topic}")
+        for event in events:
+            comment_lines.append(f"  • {event['event_type']}: {event['topic'] or ''}")
 
     comment_text = "\n".join(comment_lines)
     if description:
         comment_text += f"\n- Описание: {description}"
 
-    comment_url = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/comments"
-    comment_resp = requests.post(comment_url, headers=headers, json={"text": comment_text})
-    logger.info("Tracker comment response: %s - %s", comment_resp.status_code, comment_resp.text)
-    if comment_resp.status_code != 201:
-        raise HTTPException(status_code=500, detail=f"Ошибка добавления комментария: {comment_resp.text}")
-
-    def upload_to_tracker(file_path_local: str):
-        attach_url_local = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/attachments"
-        with open(file_path_local, "rb") as f:
-            return requests.post(
-                attach_url_local,
-                headers={
-                    "Authorization": f"OAuth {settings.TRACKER_TOKEN}",
-                    "X-Org-ID": settings.TRACKER_ORG_ID,
-                },
-                files={"file": (os.path.basename(file_path_local), f, "application/octet-stream")},
-            )
-
-    # Attach file(s) from basic file_path
-    if file_path:
-        attach_resp = upload_to_tracker(file_path)
-        if attach_resp.status_code == 201 and isinstance(attach_resp.json(), list):
-            last_att = attach_resp.json()[-1]
-            report.attachment_id = str(last_att.get("id"))  # type: ignore[assignment]
-            report.attachment_name = last_att.get("name") or os.path.basename(file_path)  # type: ignore[assignment]
-
-    # Attach publication / program / event files
+    steps: list[tuple[str, dict]] = [("comment", {"text": comment_text})]
+
+    # Файлы хранятся по SHA-256 содержимого; одинаковые тела занимают одно место на диске.
+    # Каждый шаг outbox держит ссылку на тело до загрузки в Tracker, архивная копия — навсегда.
+    blobs: list[tuple[str, int]] = []
+    file_path: str | None = None
+    file_name: str | None = None
+    if report_file is not None and report_file.filename:
+        report_filename = f"{username}_{report_file.filename}"
+        sha256, size = await store_upload(report_file)
+        blobs.append((sha256, size))
+        step = {"sha256": sha256, "filename": report_filename, "primary": True}
+        if settings.ARCHIVE_REPORT_FILES:
+            file_path, file_name = blob_path(sha256), report_filename
+        else:
+            step["release_after"] = True
+        steps.append(("attachment", step))
+
+    # Publication / program / event files
     multi_file_lists: list[list[UploadFile] | None] = [pub_file, prog_file, event_file]
     for up_files in multi_file_lists:
         if up_files:
             for uf in up_files:
                 if not uf.filename:
                     continue
-                tmp_path = os.path.join(settings.UPLOAD_DIR, uf.filename)
-                with open(tmp_path, "wb") as tmp:
-                    tmp.write(await uf.read())  # type: ignore[attr-defined]
-                attach_resp = upload_to_tracker(tmp_path)
-                # Если ещё не сохранена информация о приложении, сохраняем из первого успешно загруженного файла
-                if (
-                    attach_resp.status_code == 201
-                    and isinstance(attach_resp.json(), list)
-                    and report.attachment_id is None
-                ):
-                    first_att = attach_resp.json()[-1]
-                    report.attachment_id = str(first_att.get("id"))  # type: ignore[assignment]
-                    report.attachment_name = first_att.get("name") or uf.filename  # type: ignore[assignment]
-                os.remove(tmp_path)
-
-    # store issue_key
-    report.issue_key = issue_key  # type: ignore[assignment]
-    db.commit()
+                sha256, size = await store_upload(uf)
+                blobs.append((sha256, size))
+                steps.append(("attachment", {"sha256": sha256, "filename": uf.filename, "release_after": True}))
 
     # Move issue to "Нужна информация" after report submission
-    transitions_url = f"https://api.tracker.yandex.net/v3/issues/{issue_key}/transitions"
-    transitions_resp = requests.get(transitions_url, headers=headers)
-    if transitions_resp.status_code == 200:
-        transitions = transitions_resp.json()
-        transition = next(
-            (t for t in transitions if "нужна информация" in t["display"].lower()),
-            None,
-        )
-        if transition:
-            exec_url = (
-                f"https://api.tracker.yandex.net/v3/issues/{issue_key}/transitions/{transition['id']}/_execute"
-            )
-            requests.post(exec_url, headers=headers)
+    steps.append(("transition", {"match": "нужна информация"}))
+
+    # Persist the report, its form sections, outbox steps and rollup counters in one transaction
+    report = Report(
+        username=username,
+        programs_supported=programs_supported or 0,
+        projects_in_program=projects_in_program or 0,
+        new_scientists_employed=new_scientists_employed or 0,
+        file_path=file_path,
+        file_name=file_name,
+        issue_key=issue_key,
+        department=department,
+    )
 
+    def persist(session: Session) -> None:
+        session.add(report)
+        for sha256, size in blobs:
+            acquire_blob(session, sha256, size)
+        add_steps(session, report, steps)
+        add_report_to_rollups(session, report)
+        session.flush()
+        save_report_details(session, report.id, publications, programs, events)
+
+    await db.run_sync(persist)
+    await db.commit()
+    dispatcher.wake()
 
     return templates.TemplateResponse(
         "success.html",
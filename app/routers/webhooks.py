@@ -0,0 +1,64 @@
+import hmac
+import logging
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.models.task import Task
+from app.services.issue_status import invalidate_issue_status
+from app.services.task_sync import apply_status, parse_tracker_datetime
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/tracker/webhook", tags=["webhooks"])
+
+
+def _check_secret(token: str | None) -> None:
+    if not settings.TRACKER_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Webhook is not configured")
+    if not token or not hmac.compare_digest(token, settings.TRACKER_WEBHOOK_SECRET):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid webhook token")
+
+
+@router.post("/issue-updated")
+async def issue_updated(
+    payload: dict = Body(...),
+    token: str | None = Query(None),
+    x_webhook_token: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Receive a Tracker trigger «HTTP request» and mirror the issue status into ``tasks``.
+
+    Expected body (configured in the trigger)::
+
+        {"issue": {"key": "{{issue.key}}",
+                   "status": {"key": "{{issue.status.key}}", "display": "{{issue.status}}"},
+                   "statusStartTime": "{{issue.statusStartTime}}"}}
+
+    A flat object with the same fields is accepted too.
+    """
+    _check_secret(x_webhook_token or token)
+
+    issue = payload.get("issue") if isinstance(payload.get("issue"), dict) else payload
+    issue_key = issue.get("key")
+    issue_status = issue.get("status")
+    if isinstance(issue_status, str):
+        issue_status = {"key": issue_status}
+    if not issue_key or not isinstance(issue_status, dict) or not issue_status.get("key"):
+        raise HTTPException(status_code=422, detail="Payload must contain issue key and status key")
+
+    task = await db.scalar(select(Task).where(Task.issue_key == issue_key))
+    if task is None:
+        # Issue was not created through this service – nothing to mirror
+        return {"issue_key": issue_key, "updated": False}
+
+    changed_at = parse_tracker_datetime(issue.get("statusStartTime") or issue.get("updatedAt"))
+    updated = apply_status(task, issue_status, changed_at)
+    await db.commit()
+    if updated:
+        invalidate_issue_status(issue_key)
+        logger.info("Issue %s status -> %s (webhook)", issue_key, task.status)
+    return {"issue_key": issue_key, "updated": updated}
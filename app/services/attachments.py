@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.cache import register_cache
+from app.core.config import settings
+from app.core.tracker import tracker
+from app.core.tracker_scheduler import BULK, tracker_lane
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Markers passed from attachment fetchers to the ZIP writer
+_OK = object()
+_EOF = object()
+_FAILED = object()
+
+
+class AttachmentCache:
+    """Disk-backed cache of Tracker attachment bodies and attachment listings.
+
+    Bodies are keyed by issue key + attachment id (Tracker never changes the
+    content behind an id) and evicted least-recently-used once the directory
+    exceeds ``max_bytes``; file mtime serves as the LRU clock. Listings expire
+    after ``listing_ttl`` seconds. Files live on disk, so all workers share them.
+    """
+
+    def __init__(self, root: str, max_bytes: int, listing_ttl: float):
+        self.bodies_dir = os.path.join(root, "bodies")
+        self.listings_dir = os.path.join(root, "listings")
+        self.max_bytes = max_bytes
+        self.listing_ttl = listing_ttl
+        self.hits = 0
+        self.misses = 0
+        self.listing_hits = 0
+        self.listing_misses = 0
+        register_cache("attachments", self)
+
+    def _body_path(self, issue_key: str, attachment_id: str) -> str:
+        digest = hashlib.sha256(f"{issue_key}/{attachment_id}".encode()).hexdigest()
+        return os.path.join(self.bodies_dir, digest)
+
+    def _listing_path(self, issue_key: str) -> str:
+        return os.path.join(self.listings_dir, f"{hashlib.sha256(issue_key.encode()).hexdigest()}.json")
+
+    # --- bodies ---------------------------------------------------------
+
+    def lookup(self, issue_key: str, attachment_id: str) -> tuple[str, dict] | None:
+        """Return ``(path, meta)`` of a cached body and mark it recently used."""
+        path = self._body_path(issue_key, attachment_id)
+        try:
+            with open(f"{path}.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path, meta
+
+    async def tee(
+        self, resp: httpx.Response, issue_key: str, attachment_id: str, filename: str
+    ) -> AsyncIterator[bytes]:
+        """Yield the body of a streamed Tracker response while storing it in the cache.
+
+        The entry becomes visible only once the whole body was received; an
+        interrupted download leaves nothing behind.
+        """
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        path = self._body_path(issue_key, attachment_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        size = 0
+        completed = False
+        try:
+            with open(tmp_path, "wb") as f:
+                async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            await resp.aclose()
+            if completed:
+                meta = {
+                    "filename": filename,
+                    "content_type": resp.headers.get("Content-Type", "application/octet-stream"),
+                    "size": size,
+                }
+                _write_atomic(f"{path}.json", json.dumps(meta).encode())
+                os.replace(tmp_path, path)
+                self._evict()
+            else:
+                os.remove(tmp_path)
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.bodies_dir) as it:
+            for entry in it:
+                if entry.name.endswith((".json", ".part")):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        # Free 10% extra so eviction does not run on every insert
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            for victim in (path, f"{path}.json"):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    # --- listings -------------------------------------------------------
+
+    async def get_listing(self, issue_key: str, loader: Callable[[], Awaitable[list]]) -> list:
+        path = self._listing_path(issue_key)
+        try:
+            if time.time() - os.path.getmtime(path) < self.listing_ttl:
+                with open(path, encoding="utf-8") as f:
+                    listing = json.load(f)
+                self.listing_hits += 1
+                return listing
+        except (OSError, ValueError):
+            pass
+        self.listing_misses += 1
+        listing = await loader()
+        os.makedirs(self.listings_dir, exist_ok=True)
+        _write_atomic(path, json.dumps(listing).encode())
+        return listing
+
+    def invalidate_listing(self, issue_key: str) -> None:
+        try:
+            os.remove(self._listing_path(issue_key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "listing_hits": self.listing_hits,
+            "listing_misses": self.listing_misses,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+attachment_cache = AttachmentCache(
+    settings.ATTACHMENT_CACHE_DIR,
+    max_bytes=settings.ATTACHMENT_CACHE_MAX_BYTES,
+    listing_ttl=settings.ATTACHMENT_LIST_CACHE_TTL,
+)
+
+
+async def list_attachments(issue_key: str) -> list:
+    """Attachment listing of an issue, cached for ``ATTACHMENT_LIST_CACHE_TTL`` seconds."""
+
+    async def load() -> list:
+        resp = await tracker.get(f"/v3/issues/{issue_key}/attachments")
+        if resp.status_code != 200:
+            raise HTTPException(status_code=resp.status_code, detail="Не удалось получить список файлов")
+        return resp.json()
+
+    return await attachment_cache.get_listing(issue_key, load)
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable file object collecting what ``ZipFile`` writes until drained.
+
+    Because it cannot seek, ``zipfile`` writes every entry with a data
+    descriptor, so the archive can be sent while it is being built.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _fetch_attachment(issue_key: str, att: dict, queue: asyncio.Queue) -> None:
+    """Stream one attachment body into ``queue``: ``_OK``, chunks…, ``_EOF`` (or ``_FAILED``).
+
+    Always ends the stream: the archive writer waits on the queue, so any error
+    is reported as ``_FAILED`` rather than left to end the task silently.
+    """
+    # Runs in its own task: a many-file archive must not starve interactive calls
+    tracker_lane.set(BULK)
+    try:
+        await _put_attachment_body(issue_key, att, queue)
+    except Exception:
+        logger.exception("Не удалось получить вложение %s/%s", issue_key, att.get("id"))
+        await queue.put(_FAILED)
+
+
+async def _put_attachment_body(issue_key: str, att: dict, queue: asyncio.Queue) -> None:
+    fid = att.get("id")
+    fname = att.get("name") or str(fid)
+    f = None
+    cached = attachment_cache.lookup(issue_key, str(fid))
+    if cached is not None:
+        try:
+            # Disk reads run in the threadpool, off the event loop
+            f = await asyncio.to_thread(open, cached[0], "rb")
+        except FileNotFoundError:
+            pass  # evicted since the lookup: download it instead
+    if f is not None:
+        with f:
+            await queue.put(_OK)
+            while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+                await queue.put(chunk)
+        await queue.put(_EOF)
+        return
+    try:
+        resp = await tracker.open_stream("GET", f"/v3/issues/{issue_key}/attachments/{fid}/{fname}")
+    except httpx.HTTPError as exc:
+        logger.warning("Не удалось скачать вложение %s/%s: %s", issue_key, fid, exc)
+        await queue.put(_FAILED)
+        return
+    try:
+        if resp.status_code != 200:
+            logger.warning("Не удалось скачать вложение %s/%s: %s", issue_key, fid, resp.status_code)
+            await queue.put(_FAILED)
+            return
+        await queue.put(_OK)
+        async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+            await queue.put(chunk)
+        await queue.put(_EOF)
+    except httpx.HTTPError as exc:
+        logger.warning("Обрыв загрузки вложения %s/%s: %s", issue_key, fid, exc)
+        await queue.put(_FAILED)
+    finally:
+        await resp.aclose()
+
+
+async def stream_attachments_zip(issue_key: str, attachments: list[dict]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of ``attachments`` as it is built.
+
+    Bodies are fetched (from the disk cache or Tracker) in a window of
+    ``ATTACHMENT_ZIP_CONCURRENCY`` attachments starting at the one being written;
+    the next fetcher starts only when the window moves. Each fetcher buffers at
+    most ``ATTACHMENT_ZIP_BUFFER_CHUNKS`` chunks, so memory stays bounded whatever
+    the number and size of attachments. Attachments that cannot be downloaded are
+    skipped.
+    """
+    window = max(1, settings.ATTACHMENT_ZIP_CONCURRENCY)
+    queues: list[asyncio.Queue] = []
+    fetchers: list[asyncio.Task] = []
+
+    def start_fetchers(until: int) -> None:
+        while len(fetchers) < min(until, len(attachments)):
+            queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ATTACHMENT_ZIP_BUFFER_CHUNKS)
+            queues.append(queue)
+            fetchers.append(asyncio.create_task(_fetch_attachment(issue_key, attachments[len(fetchers)], queue)))
+
+    sink = _ZipSink()
+    try:
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+            for index, att in enumerate(attachments):
+                start_fetchers(index + window)
+                queue = queues[index]
+                if await queue.get() is not _OK:
+                    continue
+                fname = att.get("name") or str(att.get("id"))
+                force_zip64 = (att.get("size") or 0) >= zipfile.ZIP64_LIMIT
+                with zf.open(fname, "w", force_zip64=force_zip64) as entry:
+                    while True:
+                        chunk = await queue.get()
+                        if chunk is _EOF:
+                            break
+                        if chunk is _FAILED:
+                            # Part of the body is already sent: the entry stays truncated
+                            logger.error("Вложение %s в архиве %s обрезано", fname, issue_key)
+                            break
+                        entry.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                yield sink.drain()
+        # Central directory is written when the archive is closed
+        yield sink.drain()
+    finally:
+        for fetcher in fetchers:
+            fetcher.cancel()
+        await asyncio.gather(*fetchers, return_exceptions=True)
@@ -0,0 +1,60 @@
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.tracker import tracker
+
+# Only what employee_tasks.html renders
+TASK_FIELDS = ("key", "summary", "status")
+_SCROLL_TTL_MS = 60_000
+
+employee_tasks_cache = TTLCache("employee_tasks", ttl=settings.EMPLOYEE_TASKS_CACHE_TTL)
+
+
+def _task_query(login: str) -> str:
+    return (
+        f"assignee: {login} AND queue: {settings.TRACKER_QUEUE} AND status:!closed "
+        '"Sort by": Updated DESC'
+    )
+
+
+def _slim(issue: dict) -> dict:
+    status = issue.get("status") or {}
+    return {
+        "key": issue.get("key"),
+        "summary": issue.get("summary"),
+        "status": {"key": status.get("key"), "display": status.get("display")},
+    }
+
+
+async def _scroll_tasks(login: str) -> list[dict]:
+    """Every open task of ``login`` via a sorted ``_search`` scroll, capped at ``EMPLOYEE_TASKS_MAX``."""
+    per_scroll = settings.EMPLOYEE_TASKS_SCROLL_SIZE
+    params: dict = {
+        "scrollType": "sorted",
+        "perScroll": per_scroll,
+        "scrollTTLMillis": _SCROLL_TTL_MS,
+        "fields": ",".join(TASK_FIELDS),
+    }
+    body = {"query": _task_query(login)}
+    issues: list[dict] = []
+    while len(issues) < settings.EMPLOYEE_TASKS_MAX:
+        resp = await tracker.post("/v3/issues/_search", params=params, json=body)
+        if resp.status_code != 200:
+            raise HTTPException(status_code=resp.status_code, detail=resp.text)
+        batch = resp.json()
+        issues.extend(_slim(issue) for issue in batch)
+        scroll_id = resp.headers.get("X-Scroll-Id")
+        if len(batch) < per_scroll or not scroll_id:
+            break
+        params = {"scrollId": scroll_id, "scrollTTLMillis": _SCROLL_TTL_MS, "fields": params["fields"]}
+    return issues[: settings.EMPLOYEE_TASKS_MAX]
+
+
+async def get_employee_tasks(login: str) -> list[dict]:
+    """Open tasks assigned to ``login``, most recently updated first.
+
+    The whole list is fetched once per ``EMPLOYEE_TASKS_CACHE_TTL`` and paged
+    locally, so moving between pages does not hit Tracker.
+    """
+    return await employee_tasks_cache.get_or_load(login, lambda: _scroll_tasks(login))
@@ -0,0 +1,263 @@
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.core.cache import register_cache
+from app.core.config import settings
+from app.models.report import Report
+
+logger = logging.getLogger(__name__)
+
+EXCEL_HEADERS = [
+    "ID",
+    "Пользователь",
+    "Поддержано программ",
+    "Проектов в программе",
+    "Новых учёных",
+    "Дата создания",
+]
+
+_EXPORT_COLUMNS = (
+    Report.id,
+    Report.username,
+    Report.programs_supported,
+    Report.projects_in_program,
+    Report.new_scientists_employed,
+    Report.created_at,
+)
+
+_DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Bump when the layout of generated documents changes, so cached exports are rebuilt
+EXPORT_LAYOUT_VERSION = 1
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day)
+
+
+def filter_by_date(stmt, date_from: date | None, date_to: date | None):
+    """Restrict a statement over ``Report`` to the days ``date_from`` through ``date_to``.
+
+    Both bounds are plain comparisons on ``created_at`` (``>= from``, ``< to + 1 day``)
+    so the ``(created_at, id)`` index can serve them.
+    """
+    if date_from:
+        stmt = stmt.where(Report.created_at >= _day_start(date_from))
+    if date_to:
+        stmt = stmt.where(Report.created_at < _day_start(date_to + timedelta(days=1)))
+    return stmt
+
+
+def export_rows_stmt(date_from: date | None, date_to: date | None):
+    """The statement selecting export columns of matching reports, in report order."""
+    return filter_by_date(select(*_EXPORT_COLUMNS), date_from, date_to).order_by(Report.id)
+
+
+def iter_report_rows(db: Session, date_from: date | None, date_to: date | None) -> Iterator[Row]:
+    """Yield export columns of matching reports, fetched in ``EXPORT_BATCH_SIZE`` batches.
+
+    ``yield_per`` makes the PostgreSQL driver use a server-side cursor, so only
+    one batch is held in memory at a time.
+    """
+    stmt = export_rows_stmt(date_from, date_to)
+    yield from db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+
+
+def _excel_column_widths(db: Session, date_from: date | None, date_to: date | None) -> list[int]:
+    """Column widths from one aggregate query instead of a second pass over the cells."""
+    stmt = filter_by_date(
+        select(
+            func.max(Report.id),
+            func.max(func.length(Report.username)),
+            func.max(Report.programs_supported),
+            func.max(Report.projects_in_program),
+            func.max(Report.new_scientists_employed),
+        ),
+        date_from,
+        date_to,
+    )
+    max_id, max_username, *max_numbers = db.execute(stmt).one()
+    content = [
+        len(str(max_id or 0)),
+        max_username or 0,
+        *(len(str(value or 0)) for value in max_numbers),
+        len(_DATE_FORMAT.replace("%Y", "0000")),
+    ]
+    return [max(len(header), width) + 2 for header, width in zip(EXCEL_HEADERS, content)]
+
+
+def build_excel(db: Session, date_from: date | None, date_to: date | None, path: str) -> None:
+    """Write the reports workbook to ``path`` in openpyxl write-only mode (constant memory)."""
+    # Imported on first export: openpyxl adds noticeably to worker start-up
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Отчёты")
+    for index, width in enumerate(_excel_column_widths(db, date_from, date_to), start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    ws.append(EXCEL_HEADERS)
+    for row in iter_report_rows(db, date_from, date_to):
+        ws.append([
+            row.id,
+            row.username,
+            row.programs_supported,
+            row.projects_in_program,
+            row.new_scientists_employed,
+            row.created_at.strftime(_DATE_FORMAT) if row.created_at else None,
+        ])
+    wb.save(path)
+
+
+def build_word(db: Session, date_from: date | None, date_to: date | None, path: str) -> None:
+    """Write the reports document to ``path``."""
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("Отчеты пользователей", 0)
+
+    for report in iter_report_rows(db, date_from, date_to):
+        doc.add_paragraph(
+            f"ID: {report.id}\nПользователь: {report.username}\nПрограмм поддержано: {report.programs_supported}\n"
+            f"Проектов в программе: {report.projects_in_program}\nНовых ученых: {report.new_scientists_employed}\n",
+            style="Normal",
+        )
+        doc.add_paragraph("------------------------------")
+
+    doc.save(path)
+
+
+def export_filename(extension: str, date_from: date | None, date_to: date | None) -> str:
+    if date_from or date_to:
+        fname_range = f"{date_from or 'all'}_{date_to or 'all'}"
+    else:
+        fname_range = "all"
+    return f"reports_{fname_range}.{extension}"
+
+
+EXPORT_FORMATS: dict[str, tuple[Callable[..., None], str]] = {
+    "xlsx": (build_excel, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "docx": (build_word, "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+}
+
+
+def export_watermark(db: Session, date_from: date | None, date_to: date | None) -> tuple:
+    """``(max id, max created_at, count)`` of reports in range: changes whenever the export would."""
+    stmt = filter_by_date(select(func.max(Report.id), func.max(Report.created_at), func.count()), date_from, date_to)
+    max_id, max_created_at, count = db.execute(stmt).one()
+    return max_id, max_created_at.isoformat() if max_created_at else None, count
+
+
+class ExportCache:
+    """Disk cache of generated export files.
+
+    Entries are keyed by format + date range + data watermark, so a new or
+    deleted report in the range makes the next request build a fresh file while
+    the stale one ages out. Eviction is least-recently-used above ``max_bytes``
+    and drops entries unused for ``max_age`` seconds; file mtime is the LRU clock.
+    """
+
+    def __init__(self, root: str, max_bytes: int, max_age: float):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        register_cache("exports", self)
+
+    def _path(self, extension: str, date_from: date | None, date_to: date | None, watermark: tuple) -> str:
+        key = f"{EXPORT_LAYOUT_VERSION}|{extension}|{date_from}|{date_to}|{watermark}"
+        return os.path.join(self.root, f"{hashlib.sha256(key.encode()).hexdigest()}.{extension}")
+
+    def get_or_build(self, db: Session, extension: str, date_from: date | None, date_to: date | None) -> str:
+        """Path of the export file for the current data, building it on a miss."""
+        path = self._path(extension, date_from, date_to, export_watermark(db, date_from, date_to))
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        os.makedirs(self.root, exist_ok=True)
+        builder, _ = EXPORT_FORMATS[extension]
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        started = time.perf_counter()
+        try:
+            builder(db, date_from, date_to, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.build_seconds += time.perf_counter() - started
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        now = time.time()
+        entries = []
+        total = 0
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.name.endswith(".part") or entry.path == keep:
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age:
+                    _remove_quietly(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        total += os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+
+    def stats(self) -> dict:
+        entries = 0
+        size = 0
+        if os.path.isdir(self.root):
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if not entry.name.endswith(".part"):
+                        entries += 1
+                        size += entry.stat().st_size
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+export_cache = ExportCache(
+    settings.EXPORT_CACHE_DIR,
+    max_bytes=settings.EXPORT_CACHE_MAX_BYTES,
+    max_age=settings.EXPORT_CACHE_MAX_AGE,
+)
@@ -0,0 +1,27 @@
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.tracker import tracker
+
+issue_status_cache = TTLCache("issue_status", ttl=settings.ISSUE_STATUS_CACHE_TTL)
+
+
+async def get_issue_status(issue_key: str) -> dict:
+    """Return the Tracker ``status`` object of an issue, served from the TTL cache.
+
+    Concurrent requests for the same issue share a single upstream call.
+    """
+
+    async def load() -> dict:
+        resp = await tracker.get(f"/v3/issues/{issue_key}")
+        if resp.status_code != 200:
+            raise HTTPException(status_code=500, detail=f"Tracker error: {resp.text}")
+        return resp.json().get("status") or {}
+
+    return await issue_status_cache.get_or_load(issue_key, load)
+
+
+def invalidate_issue_status(issue_key: str) -> None:
+    """Drop the cached status after the issue was transitioned by us."""
+    issue_status_cache.invalidate(issue_key)
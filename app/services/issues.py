@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Callable
+
+import httpx
+
+from app.core.config import settings
+from app.core.tracker import tracker
+from app.models.task import Task
+from app.services.jobs import JobContext, job_handler
+
+logger = logging.getLogger(__name__)
+
+
+async def create_issue(payload: dict, *, start_work: bool = True) -> dict:
+    """Create one Tracker issue and optionally move it to «В работу».
+
+    Never raises for Tracker-side problems: returns a result dict with
+    ``status`` set to ``"created"`` (plus ``issue_key``) or ``"failed"`` (plus ``error``).
+    """
+    result = {"queue": payload.get("queue"), "assignee": payload.get("assignee")}
+    try:
+        resp = await tracker.post("/v3/issues/", json=payload)
+    except httpx.HTTPError as exc:
+        logger.error("Ошибка создания задачи для %s: %s", payload.get("assignee"), exc)
+        return {**result, "status": "failed", "error": str(exc) or type(exc).__name__}
+
+    if resp.status_code != 201:
+        logger.error("Ошибка создания задачи для %s: %s", payload.get("assignee"), resp.text)
+        return {**result, "status": "failed", "error": f"{resp.status_code}: {resp.text}"}
+
+    issue_key = resp.json()["key"]
+    if start_work:
+        # Переводим задачу в статус «В работу», если такой переход доступен.
+        # Ошибка перехода не отменяет уже созданную задачу.
+        try:
+            await tracker.execute_transition(
+                issue_key,
+                lambda display: display == "в работу",
+                {"comment": "Статус установлен автоматически"},
+            )
+        except httpx.HTTPError as exc:
+            logger.warning("Не удалось перевести %s в работу: %s", issue_key, exc)
+    return {**result, "status": "created", "issue_key": issue_key}
+
+
+async def create_issues(
+    payloads: list[dict],
+    concurrency: int | None = None,
+    on_result: Callable[[int, dict], None] | None = None,
+) -> list[dict]:
+    """Create issues with bounded concurrency; results keep the order of ``payloads``.
+
+    ``on_result(index, result)`` is called as soon as each item finishes.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.TRACKER_BATCH_CONCURRENCY)
+
+    async def _create(index: int, payload: dict) -> dict:
+        async with semaphore:
+            result = await create_issue(payload)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    return list(await asyncio.gather(*(_create(i, p) for i, p in enumerate(payloads))))
+
+
+@job_handler("create_issues")
+async def run_create_issues_job(ctx: JobContext) -> None:
+    """Job handler: create ``payload["issues"]`` and, if ``payload["task"]`` is set,
+    a local ``Task`` row for each created issue.
+
+    Items that already have a result (job resumed after a restart) are skipped.
+    """
+    issues: list[dict] = ctx.payload["issues"]
+    task_fields: dict | None = ctx.payload.get("task")
+    pending = ctx.pending()
+
+    def on_result(position: int, result: dict) -> None:
+        rows = []
+        if task_fields and result["status"] == "created":
+            rows.append((Task, {
+                "issue_key": result["issue_key"],
+                "queue_key": result["queue"],
+                "assignee": result["assignee"],
+                **task_fields,
+            }))
+        ctx.record(pending[position], result, rows)
+
+    await create_issues([issues[i] for i in pending], ctx.payload.get("concurrency"), on_result)
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Awaitable, Callable
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracker_scheduler import BULK, tracker_priority
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobContext"], Awaitable[None]]
+
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Register a coroutine function as the executor for jobs of ``kind``."""
+
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+
+    return decorator
+
+
+class JobContext:
+    """Progress bookkeeping handed to a job handler.
+
+    Handlers call ``record`` for each finished item; results (and any rows the
+    handler wants inserted alongside them) are buffered in memory and written by
+    ``flush``, which the runner calls periodically and when the job ends.
+    """
+
+    def __init__(self, job: Job):
+        self.job_id: int = job.id
+        self.payload: dict = job.payload
+        self.results: list[dict | None] = list(job.results or [None] * job.total)
+        self._rows: list[tuple[type, dict]] = []
+        # The heartbeat and the final flush must not insert the same rows twice
+        self._flush_lock = asyncio.Lock()
+
+    def pending(self) -> list[int]:
+        """Indices of items that have no result yet."""
+        return [i for i, r in enumerate(self.results) if r is None]
+
+    def record(self, index: int, result: dict, rows: list[tuple[type, dict]] = ()) -> None:
+        self.results[index] = result
+        self._rows.extend(rows)
+
+    async def flush(self, **values) -> None:
+        """Persist buffered rows, results and progress counters in one transaction.
+
+        Rows leave the buffer only once the transaction is committed, so a failed
+        flush is retried with the same rows by the next one.
+        """
+        async with self._flush_lock:
+            rows = list(self._rows)
+            results = list(self.results)
+            finished = [r for r in results if r is not None]
+            async with AsyncSessionLocal() as db:
+                for model, group in groupby(rows, key=lambda item: item[0]):
+                    await db.execute(insert(model), [row for _, row in group])
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == self.job_id)
+                    .values(
+                        results=results,
+                        done=len(finished),
+                        failed=sum(1 for r in finished if r.get("status") == "failed"),
+                        heartbeat_at=datetime.utcnow(),
+                        **values,
+                    )
+                )
+                await db.commit()
+                del self._rows[:len(rows)]
+
+
+class JobRunner:
+    """In-process worker pool executing jobs stored in the ``jobs`` table.
+
+    Every uvicorn worker runs one runner. Jobs are claimed with a conditional
+    UPDATE, so several workers never execute the same job; a job whose heartbeat
+    stops (worker crashed) is reclaimed after ``JOB_STALE_AFTER`` seconds and
+    resumed from its last flushed results.
+    """
+
+    def __init__(self) -> None:
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup: asyncio.Event | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._loop_task, *self._running) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    def wake(self) -> None:
+        """Look for new jobs immediately instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await self._claim_and_start()
+            except Exception:
+                logger.exception("Job runner failed to claim jobs")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_and_start(self) -> None:
+        free = settings.JOB_WORKERS - len(self._running)
+        if free <= 0:
+            return
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER)
+        claimable = or_(
+            Job.status == "queued",
+            and_(Job.status == "running", Job.heartbeat_at < stale_before),
+        )
+        async with AsyncSessionLocal() as db:
+            candidates = (await db.scalars(select(Job.id).where(claimable).order_by(Job.id).limit(free))).all()
+            for job_id in candidates:
+                now = datetime.utcnow()
+                claimed = (await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, claimable)
+                    .values(
+                        status="running",
+                        worker=self.worker_id,
+                        heartbeat_at=now,
+                        started_at=func.coalesce(Job.started_at, now),
+                    )
+                )).rowcount
+                await db.commit()
+                if not claimed:
+                    continue  # another worker got it first
+                job = await db.get(Job, job_id)
+                logger.info("Job %s (%s) claimed by %s", job_id, job.kind, self.worker_id)
+                task = asyncio.create_task(self._execute(job.kind, JobContext(job)))
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self.wake()
+
+    async def _execute(self, kind: str, ctx: JobContext) -> None:
+        handler = _handlers.get(kind)
+        if handler is None:
+            await ctx.flush(status="failed", error=f"Unknown job kind: {kind}", finished_at=datetime.utcnow())
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(ctx))
+        try:
+            with tracker_priority(BULK):
+                await handler(ctx)
+        except asyncio.CancelledError:
+            # Worker shutdown: keep progress and hand the job back to the queue
+            await ctx.flush(status="queued", worker=None)
+            raise
+        except Exception as exc:
+            logger.exception("Job %s failed", ctx.job_id)
+            await ctx.flush(status="failed", error=str(exc) or type(exc).__name__, finished_at=datetime.utcnow())
+        else:
+            await ctx.flush(status="done", finished_at=datetime.utcnow())
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, ctx: JobContext) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_FLUSH_INTERVAL)
+            try:
+                await ctx.flush()
+            except Exception:
+                logger.exception("Failed to save progress of job %s", ctx.job_id)
+
+
+runner = JobRunner()
+
+
+def enqueue_job(db: Session, kind: str, payload: dict, total: int) -> Job:
+    """Persist a new job and wake the local runner."""
+    job = Job(kind=kind, payload=payload, total=total, results=[None] * total)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    runner.wake()
+    return job
+
+
+def job_status(job: Job) -> dict:
+    """Public JSON representation of a job."""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "done": job.done,
+        "failed": job.failed,
+        "results": job.results,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
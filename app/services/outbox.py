@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import exists, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from app.core.config import settings
+from app.core.tracker import tracker
+from app.db.session import AsyncSessionLocal
+from app.models.outbox import OutboxMessage
+from app.models.report import Report
+from app.services.attachments import attachment_cache
+from app.services.issue_status import invalidate_issue_status
+from app.services.task_sync import mark_status_unknown
+from app.services.uploads import blob_path, find_attached, release_blob, remember_attached, upload_file_to_issue
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxStepError(Exception):
+    """A Tracker operation of an outbox step did not succeed; the step will be retried."""
+
+
+StepExecutor = Callable[[AsyncSession, Report, dict], Awaitable[None]]
+
+_executors: dict[str, StepExecutor] = {}
+
+
+def step_executor(kind: str):
+    """Register a coroutine function executing outbox steps of ``kind``.
+
+    Executors write to the database only after their Tracker calls, through the
+    session they are given (synchronous helpers via ``db.run_sync``); the
+    dispatcher commits those writes together with the step status.
+    """
+
+    def decorator(func: StepExecutor) -> StepExecutor:
+        _executors[kind] = func
+        return func
+
+    return decorator
+
+
+@step_executor("comment")
+async def _post_comment(db: AsyncSession, report: Report, payload: dict) -> None:
+    resp = await tracker.post(f"/v3/issues/{report.issue_key}/comments", json={"text": payload["text"]})
+    logger.info("Tracker comment response: %s - %s", resp.status_code, resp.text)
+    if resp.status_code != 201:
+        raise OutboxStepError(f"Ошибка добавления комментария: {resp.status_code} {resp.text}")
+
+
+@step_executor("attachment")
+async def _upload_attachment(db: AsyncSession, report: Report, payload: dict) -> None:
+    # Payload: {"sha256", "filename", "primary"?, "release_after"?}; steps queued
+    # before the upload store carry {"path", "delete_after"?} instead
+    sha256 = payload.get("sha256")
+    path = blob_path(sha256) if sha256 else payload["path"]
+    # The same body is already attached to the issue (e.g. re-submitted report): reuse it
+    last_att = await find_attached(report.issue_key, sha256) if sha256 else None
+    if last_att is None:
+        if not os.path.exists(path):
+            raise OutboxStepError(f"Файл {path} не найден")
+        resp = await upload_file_to_issue(report.issue_key, path, payload["filename"])
+        if resp.status_code != 201:
+            raise OutboxStepError(f"Ошибка загрузки файла: {resp.status_code} {resp.text}")
+        attachments = resp.json()
+        attachment_cache.invalidate_listing(report.issue_key)
+        if isinstance(attachments, list) and attachments:
+            last_att = attachments[-1]
+            if sha256:
+                await db.run_sync(remember_attached, report.issue_key, sha256, last_att)
+    # Основной файл отчёта всегда сохраняем; иначе — первый успешно загруженный
+    if last_att is not None and (payload.get("primary") or report.attachment_id is None):
+        report.attachment_id = str(last_att.get("id"))  # type: ignore[assignment]
+        report.attachment_name = last_att.get("name") or payload["filename"]  # type: ignore[assignment]
+    if payload.get("release_after"):
+        await db.run_sync(release_blob, sha256)
+    if payload.get("delete_after"):
+        os.remove(path)
+
+
+@step_executor("transition")
+async def _execute_transition(db: AsyncSession, report: Report, payload: dict) -> None:
+    needle = payload["match"]
+    if await tracker.execute_transition(report.issue_key, lambda display: needle in display):
+        invalidate_issue_status(report.issue_key)
+        await db.run_sync(mark_status_unknown, report.issue_key)
+
+
+def add_steps(db: Session, report: Report, steps: list[tuple[str, dict]]) -> None:
+    """Add ``(kind, payload)`` steps for ``report`` to the session.
+
+    The caller commits them together with the report, so either both exist or
+    neither does; call ``dispatcher.wake()`` after the commit.
+    """
+    report.sync_status = "pending"  # type: ignore[assignment]
+    for seq, (kind, payload) in enumerate(steps):
+        db.add(OutboxMessage(report=report, seq=seq, kind=kind, payload=payload))
+
+
+def retry_failed_steps(db: Session, report: Report) -> int:
+    """Put failed steps of ``report`` back in the queue; returns how many were reset."""
+    count = 0
+    for step in report.outbox:
+        if step.status == "failed":
+            step.status = "pending"  # type: ignore[assignment]
+            step.attempts = 0  # type: ignore[assignment]
+            step.next_attempt_at = datetime.utcnow()  # type: ignore[assignment]
+            count += 1
+    if count:
+        report.sync_status = "pending"  # type: ignore[assignment]
+    return count
+
+
+def sync_state(report: Report) -> dict:
+    """Public JSON representation of the Tracker sync state of a report."""
+    return {
+        "report_id": report.id,
+        "issue_key": report.issue_key,
+        "sync_status": report.sync_status,
+        "steps": [
+            {
+                "seq": step.seq,
+                "kind": step.kind,
+                "status": step.status,
+                "attempts": step.attempts,
+                "last_error": step.last_error,
+                "next_attempt_at": step.next_attempt_at,
+                "done_at": step.done_at,
+            }
+            for step in report.outbox
+        ],
+    }
+
+
+class OutboxDispatcher:
+    """Executes pending outbox steps of each report in order, with retries and backoff.
+
+    A report is claimed by setting ``locked_until`` on its pending steps with a
+    single conditional UPDATE, so one report is processed by one worker at a time;
+    the lease is extended before each step for as long as this worker holds it.
+    A step that keeps failing is marked ``failed`` after ``OUTBOX_MAX_ATTEMPTS``
+    and blocks the following steps until an admin retries it.
+    """
+
+    def __init__(self) -> None:
+        self._wakeup: asyncio.Event | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._loop_task, *self._running) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await self._claim_and_start()
+            except Exception:
+                logger.exception("Outbox dispatcher failed to claim reports")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_and_start(self) -> None:
+        free = settings.OUTBOX_CONCURRENCY - len(self._running)
+        if free <= 0:
+            return
+        now = datetime.utcnow()
+        unlocked = or_(OutboxMessage.locked_until.is_(None), OutboxMessage.locked_until < now)
+        earlier = aliased(OutboxMessage)
+        blocked = exists().where(
+            earlier.report_id == OutboxMessage.report_id,
+            earlier.seq < OutboxMessage.seq,
+            earlier.status != "done",
+        )
+        async with AsyncSessionLocal() as db:
+            # Reports whose next step is due
+            candidates = (await db.scalars(
+                select(OutboxMessage.report_id)
+                .where(
+                    OutboxMessage.status == "pending",
+                    OutboxMessage.next_attempt_at <= now,
+                    unlocked,
+                    ~blocked,
+                )
+                .order_by(OutboxMessage.report_id)
+                .limit(free)
+            )).all()
+            lease = now + timedelta(seconds=settings.OUTBOX_LEASE)
+            for report_id in candidates:
+                claimed = (await db.execute(
+                    update(OutboxMessage)
+                    .where(
+                        OutboxMessage.report_id == report_id,
+                        OutboxMessage.status == "pending",
+                        unlocked,
+                    )
+                    .values(locked_until=lease)
+                )).rowcount
+                await db.commit()
+                if not claimed:
+                    continue
+                task = asyncio.create_task(self._process(report_id, lease))
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Outbox processing failed", exc_info=task.exception())
+        self.wake()
+
+    @staticmethod
+    async def _load(db: AsyncSession, report_id: int) -> Report:
+        """(Re)load ``report`` with its steps, overwriting the state held in the session."""
+        return await db.get(Report, report_id, options=[selectinload(Report.outbox)], populate_existing=True)
+
+    async def _process(self, report_id: int, lease: datetime) -> None:
+        held: datetime | None = lease
+        try:
+            async with AsyncSessionLocal() as db:
+                report = await self._load(db, report_id)
+                # End the read transaction: no connection is held while Tracker is called
+                await db.commit()
+                for step in report.outbox:
+                    if step.status == "done":
+                        continue
+                    if step.status == "failed" or step.next_attempt_at > datetime.utcnow():
+                        break
+                    held = await self._renew(db, report_id, held)
+                    if held is None:
+                        logger.warning("Outbox lease of report %s was taken over, stopping", report_id)
+                        return
+                    if not await self._execute(db, report, step):
+                        break
+                if all(step.status == "done" for step in report.outbox):
+                    report.sync_status = "synced"  # type: ignore[assignment]
+                elif any(step.status == "failed" for step in report.outbox):
+                    report.sync_status = "failed"  # type: ignore[assignment]
+                await db.commit()
+        finally:
+            if held is not None:
+                await self._release(report_id, held)
+
+    @staticmethod
+    async def _renew(db: AsyncSession, report_id: int, lease: datetime) -> datetime | None:
+        """Extend the lease before a step; ``None`` if another worker has claimed the report since."""
+        renewed = datetime.utcnow() + timedelta(seconds=settings.OUTBOX_LEASE)
+        held = (await db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.report_id == report_id, OutboxMessage.locked_until == lease)
+            .values(locked_until=renewed)
+        )).rowcount
+        await db.commit()
+        return renewed if held else None
+
+    @staticmethod
+    async def _release(report_id: int, lease: datetime) -> None:
+        """Drop this worker's lease on ``report_id``, in a session of its own.
+
+        Runs after errors and cancellation too, when the processing session may
+        be unusable, so the report is picked up again without waiting for the
+        lease to expire.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.report_id == report_id, OutboxMessage.locked_until == lease)
+                    .values(locked_until=None)
+                )
+                await db.commit()
+        except Exception:
+            # Keep the original error, if any; the lease then simply expires
+            logger.exception("Failed to release the outbox lease of report %s", report_id)
+
+    async def _execute(self, db: AsyncSession, report: Report, step: OutboxMessage) -> bool:
+        executor = _executors[step.kind]
+        report_id = report.id
+        attempts = step.attempts + 1
+        step.attempts = attempts  # type: ignore[assignment]
+        try:
+            await executor(db, report, step.payload)
+        except Exception as exc:
+            expected = isinstance(exc, (OutboxStepError, httpx.HTTPError, OSError))
+            # Drop whatever the executor wrote before failing; the rollback expires
+            # the loaded objects, which cannot lazy-load here, so load them again
+            await db.rollback()
+            await self._load(db, report_id)
+            step.attempts = attempts  # type: ignore[assignment]
+            error = str(exc) or type(exc).__name__
+            step.last_error = error  # type: ignore[assignment]
+            if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                step.status = "failed"  # type: ignore[assignment]
+                logger.error(
+                    "Outbox step %s/%s of report %s failed: %s", step.seq, step.kind, report.id, error,
+                    exc_info=not expected,
+                )
+            else:
+                delay = min(settings.OUTBOX_RETRY_BASE * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX)
+                step.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)  # type: ignore[assignment]
+                asyncio.get_running_loop().call_later(delay, self.wake)
+                if expected:
+                    logger.warning(
+                        "Outbox step %s/%s of report %s failed (%s), retry in %ss",
+                        step.seq, step.kind, report.id, error, delay,
+                    )
+                else:
+                    logger.exception(
+                        "Outbox step %s/%s of report %s raised an unexpected error, retry in %ss",
+                        step.seq, step.kind, report.id, delay,
+                    )
+            await db.commit()
+            return False
+        step.status = "done"  # type: ignore[assignment]
+        step.done_at = datetime.utcnow()  # type: ignore[assignment]
+        step.last_error = None  # type: ignore[assignment]
+        await db.commit()
+        return True
+
+
+dispatcher = OutboxDispatcher()
@@ -0,0 +1,29 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.report_details import ReportEvent, ReportProgram, ReportPublication
+
+
+def form_rows(primary: tuple[str, list[str] | None], **columns: list[str] | None) -> list[dict]:
+    """Zip the parallel lists of a repeated form section into row dicts.
+
+    ``primary`` names the list that defines the number of rows; the other lists
+    may be shorter, and their missing or blank values become ``None``.
+    """
+    name, values = primary
+    return [
+        {name: value, **{col: (items[i] if items and i < len(items) else "") or None for col, items in columns.items()}}
+        for i, value in enumerate(values or [])
+    ]
+
+
+def save_report_details(
+    db: Session, report_id: int, publications: list[dict], programs: list[dict], events: list[dict]
+) -> None:
+    """Insert the extended-form sections of a report: one bulk INSERT per non-empty section."""
+    for model, rows in ((ReportPublication, publications), (ReportProgram, programs), (ReportEvent, events)):
+        if rows:
+            db.execute(
+                insert(model),
+                [{**row, "report_id": report_id, "position": position} for position, row in enumerate(rows)],
+            )
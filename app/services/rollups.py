@@ -0,0 +1,176 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.report import Report
+from app.models.rollup import ReportRollup
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("day", "week", "month")
+METRICS = ("programs_supported", "projects_in_program", "new_scientists_employed")
+
+_KEY = ("period", "period_start", "username", "department")
+
+
+def period_start(period: str, day: date) -> date:
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def _rollup_rows(username: str | None, department: str | None, created_at: datetime, metrics: dict) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "period": period,
+            "period_start": period_start(period, created_at.date()),
+            "username": username or "",
+            "department": department or "",
+            "reports_count": metrics.get("reports_count", 1),
+            **{name: metrics.get(name) or 0 for name in METRICS},
+            "updated_at": now,
+        }
+        for period in PERIODS
+    ]
+
+
+def _upsert_increment(db: Session, rows: list[dict]) -> None:
+    """Add the counters of ``rows`` to existing rollups, creating missing ones."""
+    counters = ("reports_count", *METRICS)
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(ReportRollup).values(rows)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(_KEY),
+                set_={
+                    **{name: getattr(ReportRollup, name) + getattr(stmt.excluded, name) for name in counters},
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+        )
+        return
+    # Other databases: update first, insert when nothing matched
+    for row in rows:
+        updated = db.execute(
+            update(ReportRollup)
+            .where(*(getattr(ReportRollup, name) == row[name] for name in _KEY))
+            .values(
+                **{name: getattr(ReportRollup, name) + row[name] for name in counters},
+                updated_at=row["updated_at"],
+            )
+        ).rowcount
+        if not updated:
+            db.execute(insert(ReportRollup).values(row))
+
+
+def add_report_to_rollups(db: Session, report: Report) -> None:
+    """Count a new ``report`` in its day, week and month rollups.
+
+    Runs in the caller's transaction, so the rollups change exactly when the
+    report is committed.
+    """
+    if report.created_at is None:
+        report.created_at = datetime.utcnow()  # type: ignore[assignment]
+    metrics = {name: getattr(report, name) for name in METRICS}
+    _upsert_increment(db, _rollup_rows(report.username, report.department, report.created_at, metrics))
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute every rollup from the reports table; returns the number of rollup rows."""
+    totals: dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(("reports_count", *METRICS), 0))
+    stmt = select(Report.username, Report.department, Report.created_at, *(getattr(Report, name) for name in METRICS))
+    for row in db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)):
+        if row.created_at is None:
+            continue
+        for rollup in _rollup_rows(row.username, row.department, row.created_at, row._mapping):
+            entry = totals[tuple(rollup[name] for name in _KEY)]
+            for name in entry:
+                entry[name] += rollup[name]
+    now = datetime.utcnow()
+    db.execute(delete(ReportRollup))
+    if totals:
+        db.execute(
+            insert(ReportRollup),
+            [{**dict(zip(_KEY, key)), **values, "updated_at": now} for key, values in totals.items()],
+        )
+    return len(totals)
+
+
+def backfill_rollups() -> None:
+    """Build the rollups once for reports created before the table existed."""
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        if db.query(ReportRollup.id).first() is not None or db.query(Report.id).first() is None:
+            return
+        try:
+            count = rebuild_rollups(db)
+            db.commit()
+        except IntegrityError:
+            # Another worker backfilled concurrently
+            db.rollback()
+            return
+        logger.info("Backfilled %s report rollups", count)
+
+
+def rollup_stats(
+    db: Session,
+    period: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    group_by: str | None = None,
+    split_periods: bool = True,
+) -> dict:
+    """Totals from ``report_rollups``, optionally split by ``user`` or ``department``.
+
+    Items are per period start unless ``split_periods`` is false. Filters apply
+    to period starts, so with ``week``/``month`` the first and last periods
+    cover their whole week or month; ``day`` gives exact date ranges.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    sums = [func.sum(ReportRollup.reports_count).label("reports_count")]
+    sums += [func.sum(getattr(ReportRollup, name)).label(name) for name in METRICS]
+    group_columns = [ReportRollup.period_start] if split_periods else []
+    if group_by == "user":
+        group_columns.append(ReportRollup.username)
+    elif group_by == "department":
+        group_columns.append(ReportRollup.department)
+    elif group_by is not None:
+        raise ValueError(f"Unknown grouping: {group_by}")
+
+    stmt = select(*group_columns, *sums).where(ReportRollup.period == period)
+    if date_from:
+        stmt = stmt.where(ReportRollup.period_start >= period_start(period, date_from))
+    if date_to:
+        stmt = stmt.where(ReportRollup.period_start <= date_to)
+    if group_columns:
+        stmt = stmt.group_by(*group_columns).order_by(*group_columns)
+    rows = db.execute(stmt).all()
+
+    totals = dict.fromkeys(("reports_count", *METRICS), 0)
+    items = []
+    for row in rows:
+        if not row.reports_count:
+            continue
+        item = {key: (value.isoformat() if isinstance(value, date) else value) for key, value in row._mapping.items()}
+        for name in totals:
+            item[name] = int(item[name] or 0)
+            totals[name] += item[name]
+        items.append(item)
+    return {"period": period, "group_by": group_by, "items": items, "totals": totals}
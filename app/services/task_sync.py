@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracker import tracker
+from app.core.tracker_scheduler import BULK, tracker_priority
+from app.db.session import AsyncSessionLocal
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a task no longer needs reconciliation
+CLOSED_STATUSES = frozenset({"closed", "resolved", "cancelled"})
+
+
+def parse_tracker_datetime(value: str | None) -> datetime | None:
+    """Parse Tracker timestamps (``2024-05-01T10:00:00.000+0000``) into naive UTC."""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(value, fmt).astimezone(timezone.utc).replace(tzinfo=None)
+        except ValueError:
+            continue
+    return None
+
+
+def apply_status(task: Task, status: dict, changed_at: datetime | None = None) -> bool:
+    """Copy a Tracker ``status`` object onto ``task``; returns ``True`` if it changed.
+
+    Events older than the stored status change are ignored, so out-of-order
+    webhook deliveries cannot roll the status back.
+    """
+    now = datetime.utcnow()
+    if changed_at and task.status_changed_at and changed_at < task.status_changed_at:
+        return False
+    task.synced_at = now  # type: ignore[assignment]
+    key = status.get("key")
+    if key == task.status:
+        return False
+    task.status = key  # type: ignore[assignment]
+    task.status_display = status.get("display") or key  # type: ignore[assignment]
+    task.status_changed_at = changed_at or now  # type: ignore[assignment]
+    return True
+
+
+def mark_status_unknown(db: Session, issue_key: str) -> None:
+    """Make the dashboard ask Tracker again until a webhook/reconcile confirms the new status."""
+    db.query(Task).filter(Task.issue_key == issue_key).update({Task.synced_at: None})
+
+
+async def search_issues_by_keys(keys: list[str]) -> list[dict]:
+    """Fetch issues by key list with paged ``_search`` requests."""
+    per_page = settings.TASK_RECONCILE_PAGE_SIZE
+    issues: list[dict] = []
+    for start in range(0, len(keys), per_page):
+        chunk = keys[start:start + per_page]
+        resp = await tracker.post("/v3/issues/_search", params={"perPage": per_page}, json={"keys": chunk})
+        if resp.status_code != 200:
+            logger.error("Tracker search failed: %s %s", resp.status_code, resp.text)
+            continue
+        issues.extend(resp.json())
+    return issues
+
+
+async def _claim_stale_tasks() -> list[str]:
+    """Lease open tasks not synced within the interval; returns their issue keys.
+
+    The lease keeps other workers off these tasks during the round without
+    touching ``synced_at``, which only a status actually received from Tracker sets.
+    Claiming and applying use separate short sessions: no connection is held
+    while Tracker is searched.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=settings.TASK_RECONCILE_INTERVAL)
+    async with AsyncSessionLocal() as db:
+        keys = (await db.scalars(
+            update(Task)
+            .where(
+                or_(Task.status.is_(None), Task.status.notin_(CLOSED_STATUSES)),
+                or_(Task.synced_at.is_(None), Task.synced_at < stale_before),
+                or_(Task.reconcile_locked_until.is_(None), Task.reconcile_locked_until < now),
+            )
+            .values(reconcile_locked_until=now + timedelta(seconds=settings.TASK_RECONCILE_INTERVAL))
+            .returning(Task.issue_key)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+    return list(keys)
+
+
+async def _apply_issues(keys: list[str], issues: list[dict]) -> int:
+    """Store the statuses of the ``issues`` found and release the lease on ``keys``."""
+    async with AsyncSessionLocal() as db:
+        by_key = {task.issue_key: task for task in await db.scalars(select(Task).where(Task.issue_key.in_(keys)))}
+        changed = 0
+        for issue in issues:
+            task = by_key.get(issue.get("key"))
+            if task is not None and issue.get("status"):
+                changed += apply_status(task, issue["status"], parse_tracker_datetime(issue.get("statusStartTime")))
+        for task in by_key.values():
+            task.reconcile_locked_until = None  # type: ignore[assignment]
+        await db.commit()
+    return changed
+
+
+async def reconcile_open_tasks() -> int:
+    """Refresh the mirrored status of open tasks not synced within the interval.
+
+    Returns the number of tasks whose status changed. Tasks Tracker did not
+    return stay stale and are retried in the next round.
+    """
+    keys = await _claim_stale_tasks()
+    if not keys:
+        return 0
+    try:
+        issues = await search_issues_by_keys(keys)
+    except BaseException:
+        await _apply_issues(keys, [])
+        raise
+    changed = await _apply_issues(keys, issues)
+    logger.info("Reconciled %s tasks (%s found in Tracker), %s status changes", len(keys), len(issues), changed)
+    return changed
+
+
+class TaskReconciler:
+    """Background loop running ``reconcile_open_tasks`` every few minutes in each worker."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                with tracker_priority(BULK):
+                    await reconcile_open_tasks()
+            except Exception:
+                logger.exception("Task status reconciliation failed")
+            await asyncio.sleep(settings.TASK_RECONCILE_INTERVAL)
+
+
+reconciler = TaskReconciler()
@@ -0,0 +1,222 @@
+"""Content-addressed store of uploaded report files.
+
+Bodies live under ``UPLOAD_DIR/blobs/<aa>/<bb>/<sha256>``; identical uploads
+share one file. ``upload_blobs.refcount`` counts the outbox steps and archived
+reports still needing a body, and ``tracker_attachments`` remembers which
+bodies are already attached to which issue so they are not sent again.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO
+
+import httpx
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import upload_bytes
+from app.core.tracker import tracker
+from app.models.upload import TrackerAttachment, UploadBlob
+from app.services.attachments import list_attachments
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "blobs", sha256[:2], sha256[2:4], sha256)
+
+
+async def store_upload(upload: UploadFile) -> tuple[str, int]:
+    """Copy an uploaded form file into the store in fixed-size chunks; returns ``(sha256, size)``.
+
+    The body is hashed while it is written to a temporary file, which then
+    atomically replaces the blob path, so a blob file is always complete. The
+    copy runs in a worker thread, off the event loop. The caller must reference
+    the blob (``acquire_blob``) in its transaction.
+    """
+    await upload.seek(0)
+    sha256, size = await asyncio.to_thread(_copy_to_store, upload.file)
+    upload_bytes.labels("received").inc(size)
+    return sha256, size
+
+
+def _copy_to_store(source: BinaryIO) -> tuple[str, int]:
+    tmp_dir = os.path.join(settings.UPLOAD_DIR, "blobs", "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            while chunk := source.read(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+            size = f.tell()
+        sha256 = digest.hexdigest()
+        path = blob_path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sha256, size
+
+
+def acquire_blob(db: Session, sha256: str, size: int) -> None:
+    """Add one reference to a stored body, creating its row on first use."""
+    now = datetime.utcnow()
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(UploadBlob).values(sha256=sha256, size=size, refcount=1, created_at=now, last_used_at=now)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["sha256"],
+                set_={"refcount": UploadBlob.refcount + 1, "last_used_at": now},
+            )
+        )
+        return
+    # Other databases: update first, insert when nothing matched
+    updated = db.execute(
+        update(UploadBlob).where(UploadBlob.sha256 == sha256).values(refcount=UploadBlob.refcount + 1, last_used_at=now)
+    ).rowcount
+    if not updated:
+        db.execute(insert(UploadBlob).values(sha256=sha256, size=size, refcount=1, created_at=now, last_used_at=now))
+
+
+def release_blob(db: Session, sha256: str) -> None:
+    """Drop one reference; the body is removed by ``purge_unreferenced_blobs`` later.
+
+    Files are not deleted here: a concurrent upload of the same content may
+    already have written the blob and be about to reference it.
+    """
+    db.execute(
+        update(UploadBlob)
+        .where(UploadBlob.sha256 == sha256)
+        .values(refcount=UploadBlob.refcount - 1, last_used_at=datetime.utcnow())
+    )
+
+
+def purge_unreferenced_blobs() -> int:
+    """Delete bodies unreferenced for ``UPLOAD_BLOB_GRACE`` seconds; returns how many.
+
+    Also removes files older than the grace period that no row accounts for:
+    bodies whose uploading transaction failed after the copy, and partial
+    copies left in ``blobs/tmp``.
+    """
+    from app.db.session import SessionLocal
+
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.UPLOAD_BLOB_GRACE)
+    unreferenced = (UploadBlob.refcount <= 0, UploadBlob.last_used_at < cutoff)
+    purged = 0
+    with SessionLocal() as db:
+        for sha256 in db.scalars(select(UploadBlob.sha256).where(*unreferenced)).all():
+            # Conditional delete: skip a body referenced again meanwhile
+            if not db.execute(delete(UploadBlob).where(UploadBlob.sha256 == sha256, *unreferenced)).rowcount:
+                continue
+            db.commit()
+            try:
+                os.remove(blob_path(sha256))
+            except FileNotFoundError:
+                pass
+            purged += 1
+        orphans = _purge_orphan_files(db, time.time() - settings.UPLOAD_BLOB_GRACE)
+    if purged or orphans:
+        logger.info("Purged %s unreferenced upload blobs and %s orphan files", purged, orphans)
+    return purged + orphans
+
+
+def _purge_orphan_files(db: Session, older_than: float) -> int:
+    """Remove files under ``blobs/`` last modified before ``older_than`` that have no ``upload_blobs`` row."""
+    root = os.path.join(settings.UPLOAD_DIR, "blobs")
+    tmp_dir = os.path.join(root, "tmp")
+    removed = 0
+    for dirpath, _, filenames in os.walk(root):
+        old = [name for name in filenames if _mtime(os.path.join(dirpath, name)) < older_than]
+        if not old:
+            continue
+        if dirpath == tmp_dir:
+            stale = old
+        else:
+            known = set(db.scalars(select(UploadBlob.sha256).where(UploadBlob.sha256.in_(old))))
+            stale = [name for name in old if name not in known]
+        for name in stale:
+            try:
+                os.remove(os.path.join(dirpath, name))
+            except FileNotFoundError:
+                continue
+            removed += 1
+    return removed
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return float("inf")
+
+
+async def find_attached(issue_key: str, sha256: str) -> dict | None:
+    """The Tracker attachment (``{"id", "name"}``) holding this body on the issue, if it still exists.
+
+    Reads and cleans up in short sessions of its own: no connection is held
+    while the listing is fetched from Tracker.
+    """
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        known = await db.scalar(
+            select(TrackerAttachment).where(TrackerAttachment.issue_key == issue_key, TrackerAttachment.sha256 == sha256)
+        )
+    if known is None:
+        return None
+    try:
+        listing = await list_attachments(issue_key)
+    except HTTPException:
+        return None  # cannot check: upload again rather than point at a missing file
+    if not any(str(att.get("id")) == known.attachment_id for att in listing):
+        # Removed in Tracker since
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(TrackerAttachment).where(TrackerAttachment.id == known.id))
+            await db.commit()
+        return None
+    return {"id": known.attachment_id, "name": known.name}
+
+
+def remember_attached(db: Session, issue_key: str, sha256: str, attachment: dict) -> None:
+    try:
+        with db.begin_nested():
+            db.add(
+                TrackerAttachment(
+                    issue_key=issue_key,
+                    sha256=sha256,
+                    attachment_id=str(attachment.get("id")),
+                    name=attachment.get("name"),
+                )
+            )
+    except IntegrityError:
+        pass  # the same body was attached concurrently by another report
+
+
+async def upload_file_to_issue(issue_key: str, path: str, filename: str) -> httpx.Response:
+    """Stream a file from disk to Tracker as an issue attachment (64 KiB chunks)."""
+    with open(path, "rb") as f:
+        resp = await tracker.post(
+            f"/v3/issues/{issue_key}/attachments",
+            files={"file": (filename, f, "application/octet-stream")},
+        )
+    if resp.status_code == 201:
+        upload_bytes.labels("sent_to_tracker").inc(os.path.getsize(path))
+    return resp
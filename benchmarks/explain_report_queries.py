@@ -0,0 +1,54 @@
+"""Check that report list and export queries are served by ``ix_reports_created_at_id``.
+
+Usage::
+
+    python -m benchmarks.explain_report_queries
+
+Runs EXPLAIN for the admin list (first and later pages, with and without a
+date range) and the export row query (the statements the app runs) against ``DATABASE_URL`` (a throw-away
+SQLite database when unset), prints the plans and exits with status 1 if a
+plan does not mention the index. On PostgreSQL fill the table first: the
+planner prefers a sequential scan on a near-empty table.
+"""
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+
+INDEX_NAME = "ix_reports_created_at_id"
+
+
+def main() -> int:
+    from sqlalchemy import text
+
+    from app.db.bootstrap import bootstrap
+    from app.db.session import engine
+    from app.routers.admin import admin_list_stmt
+    from app.services.exports import export_rows_stmt
+
+    bootstrap()
+    date_from, date_to = date(2024, 1, 1), date(2024, 12, 31)
+    cursor = (datetime(2024, 6, 1), 1000)
+    statements = {
+        "admin list, first page": admin_list_stmt(None, None, None),
+        "admin list, date range": admin_list_stmt(date_from, date_to, None),
+        "admin list, next page": admin_list_stmt(date_from, date_to, cursor),
+        "export rows, date range": export_rows_stmt(date_from, date_to),
+    }
+    explain = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+
+    failed = False
+    with engine.connect() as conn:
+        for name, stmt in statements.items():
+            compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+            plan = "\n".join(" ".join(str(col) for col in row) for row in conn.execute(text(f"{explain} {compiled}")))
+            ok = INDEX_NAME in plan
+            failed |= not ok
+            print(f"[{'ok' if ok else 'NO INDEX'}] {name}\n{plan}\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'explain.sqlite')}"
+    sys.exit(main())
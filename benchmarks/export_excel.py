@@ -0,0 +1,92 @@
+"""Peak memory of the Excel export for growing numbers of reports.
+
+Usage::
+
+    python -m benchmarks.export_excel [1000 10000 100000 1000000]
+
+Each size runs in a fresh interpreter against a throw-away SQLite database
+(or ``DATABASE_URL`` when set, e.g. a scratch PostgreSQL where ``yield_per``
+uses a real server-side cursor). With the streaming export the peak RSS stays
+flat as the number of reports grows.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+INSERT_BATCH = 10_000
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_one(count: int) -> None:
+    from datetime import datetime
+
+    from sqlalchemy import delete, insert
+
+    from app.db.bootstrap import bootstrap
+    from app.db.session import SessionLocal
+    from app.models.report import Report
+    from app.services.exports import build_excel
+
+    bootstrap()
+    with SessionLocal() as db:
+        db.execute(delete(Report))
+        now = datetime.utcnow()
+        for start in range(0, count, INSERT_BATCH):
+            db.execute(
+                insert(Report),
+                [
+                    {
+                        "username": f"user{i}",
+                        "programs_supported": i % 7,
+                        "projects_in_program": i % 13,
+                        "new_scientists_employed": i % 5,
+                        "created_at": now,
+                    }
+                    for i in range(start, min(start + INSERT_BATCH, count))
+                ],
+            )
+        db.commit()
+
+    baseline = _peak_rss_mb()
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    started = time.perf_counter()
+    try:
+        with SessionLocal() as db:
+            build_excel(db, None, None, path)
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{count:>10,} reports  {elapsed:8.1f} s  {size / 1024 / 1024:8.1f} MiB file  "
+        f"peak RSS {_peak_rss_mb():7.1f} MiB (before export {baseline:.1f} MiB)"
+    )
+
+
+def main(sizes: list[int]) -> None:
+    for count in sizes:
+        env = dict(os.environ)
+        with tempfile.TemporaryDirectory() as tmp:
+            env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.export_excel", "--one", str(count)],
+                env=env,
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--one"]:
+        _run_one(int(sys.argv[2]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,199 @@
+"""In-memory stand-in for the Yandex Tracker API used by the load test.
+
+Usage::
+
+    uvicorn benchmarks.fake_tracker:app --port 8100
+
+Implements the calls the application makes: issue creation and lookup,
+``_search`` (by keys, by query with paging or scroll), comments, attachments
+(upload, listing, download), transitions, queues, users and ``/myself``.
+``/myself`` returns the login encoded in the token: ``OAuth user-<login>``.
+
+Latency and failures are injected from the environment:
+
+* ``FAKE_TRACKER_LATENCY`` — mean added delay per request, seconds (0.05)
+* ``FAKE_TRACKER_JITTER`` — ± uniform spread around the mean, seconds (0.02)
+* ``FAKE_TRACKER_ERROR_RATE`` — share of requests answered with 503 (0)
+* ``FAKE_TRACKER_THROTTLE_RATE`` — share answered with 429 and ``Retry-After: 1`` (0)
+
+State lives in the process, so run it with a single worker.
+"""
+import asyncio
+import itertools
+import os
+import random
+import re
+
+from fastapi import FastAPI, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import JSONResponse
+
+LATENCY = float(os.environ.get("FAKE_TRACKER_LATENCY", "0.05"))
+JITTER = float(os.environ.get("FAKE_TRACKER_JITTER", "0.02"))
+ERROR_RATE = float(os.environ.get("FAKE_TRACKER_ERROR_RATE", "0"))
+THROTTLE_RATE = float(os.environ.get("FAKE_TRACKER_THROTTLE_RATE", "0"))
+
+# Transition id -> (display name, resulting status)
+TRANSITIONS = {
+    "start": ("В работу", {"key": "inProgress", "display": "В работе"}),
+    "needInfo": ("Нужна информация", {"key": "needInfo", "display": "Нужна информация"}),
+    "close": ("Закрыть", {"key": "closed", "display": "Закрыт"}),
+}
+QUEUES = ["LOAD"]
+TEAM_SIZE = 50
+
+app = FastAPI(title="Fake Tracker")
+
+issues: dict[str, dict] = {}
+attachments: dict[str, list[dict]] = {}
+attachment_bodies: dict[str, bytes] = {}
+_issue_numbers: dict[str, itertools.count] = {}
+_attachment_ids = itertools.count(1)
+
+
+@app.middleware("http")
+async def inject_latency_and_errors(request: Request, call_next):
+    delay = max(0.0, LATENCY + random.uniform(-JITTER, JITTER))
+    if delay:
+        await asyncio.sleep(delay)
+    roll = random.random()
+    if roll < THROTTLE_RATE:
+        return JSONResponse({"errorMessages": ["Too many requests"]}, status_code=429, headers={"Retry-After": "1"})
+    if roll < THROTTLE_RATE + ERROR_RATE:
+        return JSONResponse({"errorMessages": ["Service unavailable"]}, status_code=503)
+    return await call_next(request)
+
+
+def _issue(key: str) -> dict:
+    issue = issues.get(key)
+    if issue is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    return issue
+
+
+def _login(value) -> str | None:
+    if isinstance(value, dict):
+        return value.get("id") or value.get("login")
+    return value
+
+
+@app.post("/v3/issues/", status_code=201)
+async def create_issue(payload: dict):
+    queue = payload.get("queue") or QUEUES[0]
+    number = next(_issue_numbers.setdefault(queue, itertools.count(1)))
+    key = f"{queue}-{number}"
+    issues[key] = {
+        "key": key,
+        "summary": payload.get("summary"),
+        "description": payload.get("description"),
+        "queue": {"key": queue},
+        "assignee": {"id": _login(payload.get("assignee")), "display": _login(payload.get("assignee"))},
+        "status": {"key": "open", "display": "Открыт"},
+        "updatedAt": "2024-01-01T00:00:00.000+0000",
+    }
+    return issues[key]
+
+
+@app.post("/v3/issues/_search")
+async def search_issues(request: Request, payload: dict):
+    params = request.query_params
+    if "keys" in payload:
+        found = [issues[key] for key in payload["keys"] if key in issues]
+    else:
+        match = re.search(r"assignee:\s*(\S+)", payload.get("query") or "")
+        assignee = match.group(1) if match else None
+        found = [
+            issue
+            for issue in issues.values()
+            if issue["status"]["key"] != "closed" and (assignee is None or issue["assignee"]["id"] == assignee)
+        ]
+    headers = {"X-Total-Count": str(len(found))}
+    if "scrollType" in params or "scrollId" in params:
+        size = int(params.get("perScroll", 100))
+        start = int(params.get("scrollId", 0))
+        page = found[start:start + size]
+        headers["X-Scroll-Id"] = str(start + size)
+    else:
+        size = int(params.get("perPage", 50))
+        start = (int(params.get("page", 1)) - 1) * size
+        page = found[start:start + size]
+    return JSONResponse(page, headers=headers)
+
+
+@app.get("/v3/issues/{key}")
+async def get_issue(key: str):
+    return _issue(key)
+
+
+@app.post("/v3/issues/{key}/comments", status_code=201)
+async def add_comment(key: str, payload: dict):
+    _issue(key)
+    return {"id": random.randint(1, 10**9), "text": payload.get("text")}
+
+
+@app.post("/v3/issues/{key}/attachments", status_code=201)
+async def upload_attachment(key: str, file: UploadFile = File(...)):
+    _issue(key)
+    body = await file.read()
+    att = {"id": str(next(_attachment_ids)), "name": file.filename, "size": len(body), "mimetype": file.content_type}
+    attachments.setdefault(key, []).append(att)
+    attachment_bodies[att["id"]] = body
+    return [att]
+
+
+@app.get("/v3/issues/{key}/attachments")
+async def list_attachments(key: str):
+    _issue(key)
+    return attachments.get(key, [])
+
+
+@app.get("/v3/issues/{key}/attachments/{attachment_id}/{filename:path}")
+async def download_attachment(key: str, attachment_id: str, filename: str):
+    body = attachment_bodies.get(attachment_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return Response(body, media_type="application/octet-stream")
+
+
+def _transitions() -> list[dict]:
+    return [{"id": tid, "display": display} for tid, (display, _) in TRANSITIONS.items()]
+
+
+@app.get("/v3/issues/{key}/transitions")
+async def list_transitions(key: str):
+    _issue(key)
+    return _transitions()
+
+
+@app.post("/v3/issues/{key}/transitions/{transition_id}/_execute")
+async def execute_transition(key: str, transition_id: str):
+    issue = _issue(key)
+    if transition_id not in TRANSITIONS:
+        raise HTTPException(status_code=404, detail="Transition not found")
+    issue["status"] = dict(TRANSITIONS[transition_id][1])
+    return _transitions()
+
+
+@app.get("/v3/queues")
+async def list_queues():
+    return [{"key": key, "name": f"Очередь {key}"} for key in QUEUES]
+
+
+@app.get("/v3/queues/{queue_key}")
+async def get_queue(queue_key: str):
+    team = [{"id": f"user{i}", "login": f"user{i}", "display": f"User {i}"} for i in range(TEAM_SIZE)]
+    return {"key": queue_key, "name": f"Очередь {queue_key}", "teamUsers": team}
+
+
+@app.get("/v3/users/{login}")
+async def get_user(login: str):
+    return {"login": login, "display": login}
+
+
+@app.get("/v3/myself")
+async def myself(request: Request):
+    token = request.headers.get("Authorization", "").removeprefix("OAuth ").strip()
+    if token.startswith("user-"):
+        return {"login": token.removeprefix("user-"), "display": token}
+    if token:
+        return {"login": "robot", "display": "Robot"}
+    raise HTTPException(status_code=401, detail="No token")
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway SQLite database first
+_workdir = tempfile.mkdtemp(prefix="report-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'test.sqlite')}")
+
+import pytest  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        yield session
+    Base.metadata.drop_all(bind=engine)
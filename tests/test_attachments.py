@@ -0,0 +1,28 @@
+import asyncio
+import io
+import zipfile
+
+from app.services import attachments
+
+
+def test_zip_skips_attachment_whose_fetch_raises(monkeypatch, tmp_path):
+    cached = tmp_path / "cached"
+    cached.write_bytes(b"body")
+
+    def lookup(issue_key, attachment_id):
+        # "2" was evicted between lookup and open
+        return (str(cached if attachment_id == "1" else tmp_path / "evicted"),)
+
+    async def open_stream(method, url):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(attachments.attachment_cache, "lookup", lookup)
+    monkeypatch.setattr(attachments.tracker, "open_stream", open_stream)
+
+    async def build():
+        items = [{"id": "1", "name": "a.txt"}, {"id": "2", "name": "b.txt"}]
+        return b"".join([chunk async for chunk in attachments.stream_attachments_zip("Q-1", items)])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(asyncio.wait_for(build(), 10))))
+    assert archive.namelist() == ["a.txt"]
+    assert archive.read("a.txt") == b"body"
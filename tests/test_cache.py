@@ -0,0 +1,25 @@
+import asyncio
+
+from app.core.cache import TTLCache
+
+
+def test_cancelled_loader_does_not_fail_waiters():
+    cache = TTLCache("test_cancelled_loader", ttl=10)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_load("key", loader)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == [2, 2, 2]
+    assert calls == 2
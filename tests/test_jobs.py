@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.db.session import async_engine
+from app.models.job import Job
+from app.models.task import Task
+from app.services import jobs
+from app.services.jobs import JobContext
+
+
+def _task_row(index: int) -> tuple[type, dict]:
+    return (Task, {"issue_key": f"Q-{index}", "queue_key": "Q", "assignee": f"user{index}", "summary": "s"})
+
+
+def test_failed_flush_keeps_buffered_rows(db, monkeypatch):
+    job = Job(kind="create_issues", payload={}, total=2, results=[None, None])
+    db.add(job)
+    db.commit()
+    ctx = JobContext(job)
+    ctx.record(0, {"status": "created", "issue_key": "Q-0"}, [_task_row(0)])
+
+    session_factory = jobs.AsyncSessionLocal
+
+    def failing_session():
+        session = session_factory()
+
+        async def commit():
+            raise RuntimeError("database went away")
+
+        session.commit = commit
+        return session
+
+    async def flush_twice():
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", failing_session)
+        with pytest.raises(RuntimeError):
+            await ctx.flush()
+        monkeypatch.setattr(jobs, "AsyncSessionLocal", session_factory)
+
+        ctx.record(1, {"status": "created", "issue_key": "Q-1"}, [_task_row(1)])
+        await ctx.flush(status="done")
+        await async_engine.dispose()
+
+    asyncio.run(flush_twice())
+
+    db.expire_all()
+    assert sorted(task.issue_key for task in db.query(Task)) == ["Q-0", "Q-1"]
+    assert db.get(Job, job.id).done == 2
+    assert ctx._rows == []
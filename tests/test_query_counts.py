@@ -0,0 +1,42 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_package
+from app.core.config import settings
+from app.core.security import _create_session_cookie
+from app.db.query_log import assert_max_queries
+from app.models.report import Report
+from app.models.user import User
+
+ADMIN = next(iter(settings.admin_logins))
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    # Templates, static files and uploads are resolved relative to the working directory
+    (tmp_path / "app").symlink_to(os.path.dirname(app_package.__file__))
+    for name in ("static", "uploaded_files"):
+        (tmp_path / name).mkdir()
+    monkeypatch.chdir(tmp_path)
+    from app.main import app
+
+    db.add_all([User(login=ADMIN, is_admin=True), User(login="user1", is_admin=False)])
+    db.add_all(Report(username=f"user{i}", department=f"dep{i % 3}") for i in range(20))
+    db.commit()
+    # No ``with``: the lifespan is not started, so background loops add no queries
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "login, url",
+    [(ADMIN, "/admin"), (ADMIN, "/admin/stats"), ("user1", "/dashboard/user1")],
+)
+def test_page_query_count_does_not_grow_with_reports(client, login, url):
+    """A bounded number of statements per page, whatever the number of reports (no N+1)."""
+    client.cookies.set("session", _create_session_cookie(login))
+    client.get(url)  # warm the session-user cache
+    with assert_max_queries(6):
+        response = client.get(url)
+    assert response.status_code == 200, response.text
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.routers.admin import admin_list_stmt
+from app.services.exports import export_rows_stmt
+
+INDEX_NAME = "ix_reports_created_at_id"
+DATE_FROM, DATE_TO = date(2024, 1, 1), date(2024, 12, 31)
+
+STATEMENTS = {
+    "admin list, first page": lambda: admin_list_stmt(None, None, None),
+    "admin list, date range": lambda: admin_list_stmt(DATE_FROM, DATE_TO, None),
+    "admin list, next page": lambda: admin_list_stmt(DATE_FROM, DATE_TO, (datetime(2024, 6, 1), 1000)),
+    "export rows, date range": lambda: export_rows_stmt(DATE_FROM, DATE_TO),
+}
+
+
+@pytest.mark.parametrize("name", STATEMENTS)
+def test_report_queries_use_created_at_index(db, name):
+    """The statements the app runs are served by the ``(created_at, id)`` index (SQLite plan).
+
+    ``python -m benchmarks.explain_report_queries`` runs the same check against PostgreSQL.
+    """
+    bind = db.get_bind()
+    compiled = STATEMENTS[name]().compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = "\n".join(" ".join(str(col) for col in row) for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert INDEX_NAME in plan, plan
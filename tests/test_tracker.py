@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import httpx
+
+from app.core import tracker as tracker_module
+from app.core.config import settings
+from app.core.tracker_scheduler import TrackerScheduler
+
+
+def test_retry_after_is_honoured_without_rate_limit(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.3"})
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(tracker_module, "scheduler", TrackerScheduler(rate=0, burst=1))
+    monkeypatch.setattr(settings, "TRACKER_RETRIES", 1)
+
+    async def call():
+        client = tracker_module.TrackerClient()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://tracker")
+        try:
+            return await client.get("/v3/myself")
+        finally:
+            await client._client.aclose()
+
+    assert asyncio.run(call()).status_code == 200
+    assert calls[1] - calls[0] >= 0.3
@@ -0,0 +1,33 @@
+import os
+import time
+
+from app.core.config import settings
+from app.models.upload import UploadBlob
+from app.services.uploads import blob_path, purge_unreferenced_blobs
+
+
+def _write(path: str, age: float) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"body")
+    past = time.time() - age
+    os.utime(path, (past, past))
+
+
+def test_purge_removes_files_without_rows(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    grace = settings.UPLOAD_BLOB_GRACE
+    kept, orphan, fresh = "a" * 64, "b" * 64, "c" * 64
+    db.add(UploadBlob(sha256=kept, size=4, refcount=1))
+    db.commit()
+    _write(blob_path(kept), grace * 2)
+    _write(blob_path(orphan), grace * 2)  # its transaction failed after the copy
+    _write(blob_path(fresh), 0)  # an upload still committing
+    stale_tmp = os.path.join(str(tmp_path), "blobs", "tmp", "partial")
+    _write(stale_tmp, grace * 2)
+
+    assert purge_unreferenced_blobs() == 2
+    assert os.path.exists(blob_path(kept))
+    assert os.path.exists(blob_path(fresh))
+    assert not os.path.exists(blob_path(orphan))
+    assert not os.path.exists(stale_tmp)